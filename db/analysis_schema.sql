@@ -47,6 +47,9 @@ ON article_tags(tag_id);
 CREATE INDEX IF NOT EXISTS idx_article_tags_article
 ON article_tags(article_uid);
 
+CREATE INDEX IF NOT EXISTS idx_article_tags_export
+ON article_tags(article_uid, tag_id, method, confidence);
+
 CREATE TABLE IF NOT EXISTS shift_annotation_runs (
     id INTEGER PRIMARY KEY,
     run_uid TEXT NOT NULL UNIQUE,
@@ -83,6 +86,9 @@ ON shift_annotations(article_uid, shift_id, annotation_version, input_fingerprin
 CREATE INDEX IF NOT EXISTS idx_shift_annotations_lookup
 ON shift_annotations(article_uid, shift_id, generated_at DESC, id DESC);
 
+CREATE INDEX IF NOT EXISTS idx_shift_annotations_latest
+ON shift_annotations(article_uid, shift_id, id DESC);
+
 CREATE INDEX IF NOT EXISTS idx_shift_annotations_run_uid
 ON shift_annotations(run_uid);
 
@@ -125,5 +131,8 @@ ON republic_shift_evidence(article_uid, version, input_fingerprint);
 CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_lookup
 ON republic_shift_evidence(article_uid, generated_at DESC, id DESC);
 
+CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_latest
+ON republic_shift_evidence(article_uid, id DESC);
+
 CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_selected
 ON republic_shift_evidence(include_in_story, phase, relevance_score DESC);
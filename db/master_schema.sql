@@ -42,6 +42,9 @@ ON articles(year);
 CREATE INDEX IF NOT EXISTS idx_articles_status
 ON articles(status);
 
+CREATE INDEX IF NOT EXISTS idx_articles_status_published
+ON articles(status, published_at DESC, id DESC);
+
 CREATE INDEX IF NOT EXISTS idx_articles_title_date
 ON articles(normalized_title, published_at);
 
@@ -128,6 +128,9 @@ ON shift_annotations(article_id, shift_id, annotation_version, input_fingerprint
 CREATE INDEX IF NOT EXISTS idx_shift_annotations_lookup
 ON shift_annotations(article_id, shift_id, generated_at DESC, id DESC);
 
+CREATE INDEX IF NOT EXISTS idx_shift_annotations_latest
+ON shift_annotations(article_id, shift_id, id DESC);
+
 CREATE INDEX IF NOT EXISTS idx_shift_annotations_run_uid
 ON shift_annotations(run_uid);
 
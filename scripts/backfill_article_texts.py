@@ -4,40 +4,203 @@
 from __future__ import annotations
 
 import argparse
+import random
 import re
 import sqlite3
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import nullcontext
+from functools import partial
 from html import unescape
+from itertools import islice
 from pathlib import Path
 from time import sleep
+from typing import NamedTuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    from lxml import etree as lxml_etree
+    from lxml import html as lxml_html
+except ImportError:
+    lxml_etree = None
+    lxml_html = None
+
+try:
+    import trafilatura
+except ImportError:
+    trafilatura = None
+
+TAG_RE = re.compile(r"<[^>]+>", re.IGNORECASE | re.DOTALL)
+WS_RE = re.compile(r"\s+")
+P_RE = re.compile(r"<p\b[^>]*>(.*?)</p>", re.IGNORECASE | re.DOTALL)
+ARTICLE_RE = re.compile(r"<article\b[^>]*>(.*?)</article>", re.IGNORECASE | re.DOTALL)
+MAIN_RE = re.compile(r"<main\b[^>]*>(.*?)</main>", re.IGNORECASE | re.DOTALL)
+BODY_RE = re.compile(r"<body\b[^>]*>(.*?)</body>", re.IGNORECASE | re.DOTALL)
+MIN_PARAGRAPH_CHARS = 40
+MAX_BACKOFF_SECONDS = 30
+FULL_TEXT_MIN_WORDS = 250
+
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate",
+}
+
+# One pooled session for the whole run so repeat hosts reuse TCP/TLS connections.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+SESSION.mount("http://", HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=0))
+
+FETCH_FAILED_METHOD = "fetch_failed_v1"
+
+PENDING_ROWS_SQL = """
+    FROM articles a
+    LEFT JOIN article_texts t
+        ON t.article_uid = a.article_uid
+       AND t.is_primary = 1
+    WHERE a.status IN ('verified', 'published')
+      AND (a.canonical_url LIKE 'http://%' OR a.canonical_url LIKE 'https://%')
+      AND (
+            t.article_uid IS NULL
+         OR t.text_state <> 'full'
+         OR t.body_text IS NULL
+         OR TRIM(t.body_text) = ''
+      )
+"""
+
+# Relies on the partial unique index idx_article_texts_primary from master_schema.sql.
+UPSERT_TEXT_SQL = """
+    INSERT INTO article_texts (
+        article_uid,
+        body_text,
+        text_state,
+        text_format,
+        word_count,
+        language,
+        extraction_method,
+        extraction_model,
+        source_url,
+        extracted_at,
+        is_primary
+    )
+    VALUES (?, ?, ?, 'plain', ?, 'en', ?, NULL, ?, CURRENT_TIMESTAMP, 1)
+    ON CONFLICT(article_uid, is_primary) WHERE is_primary = 1 DO UPDATE SET
+        body_text = excluded.body_text,
+        text_state = excluded.text_state,
+        text_format = excluded.text_format,
+        word_count = excluded.word_count,
+        language = excluded.language,
+        extraction_method = excluded.extraction_method,
+        extraction_model = excluded.extraction_model,
+        source_url = excluded.source_url,
+        extracted_at = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+"""
+
+# Negative cache for URLs that failed to fetch. Rows that already hold some text are left as-is.
+MARK_FETCH_FAILED_SQL = f"""
+    INSERT INTO article_texts (
+        article_uid,
+        body_text,
+        text_state,
+        text_format,
+        word_count,
+        language,
+        extraction_method,
+        extraction_model,
+        source_url,
+        extracted_at,
+        is_primary
+    )
+    VALUES (?, NULL, 'missing', 'plain', NULL, 'en', '{FETCH_FAILED_METHOD}', NULL, ?, CURRENT_TIMESTAMP, 1)
+    ON CONFLICT(article_uid, is_primary) WHERE is_primary = 1 DO UPDATE SET
+        extraction_method = excluded.extraction_method,
+        source_url = excluded.source_url,
+        extracted_at = CURRENT_TIMESTAMP,
+        updated_at = CURRENT_TIMESTAMP
+    WHERE article_texts.body_text IS NULL OR TRIM(article_texts.body_text) = ''
+"""
+
+
+def pending_rows_sql(retry_failed: bool) -> str:
+    if retry_failed:
+        return PENDING_ROWS_SQL
+    return f"{PENDING_ROWS_SQL}  AND COALESCE(t.extraction_method, '') <> '{FETCH_FAILED_METHOD}'\n"
+
+
+class ExtractResult(NamedTuple):
+    text: str
+    words: int
+    state: str
+    method: str
+
+
+def text_state_for(words: int) -> str:
+    return "full" if words >= FULL_TEXT_MIN_WORDS else ("partial" if words > 0 else "missing")
 
 
 def sanitize_text(text: str) -> str:
-    cleaned = re.sub(r"(?is)<[^>]+>", " ", text)
+    cleaned = TAG_RE.sub(" ", text)
     cleaned = unescape(cleaned)
-    cleaned = re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = WS_RE.sub(" ", cleaned).strip()
     return cleaned
 
 
 def pick_html_block(html: str) -> str:
-    for tag in ("article", "main"):
-        match = re.search(rf"(?is)<{tag}\b[^>]*>(.*?)</{tag}>", html)
+    for pattern in (ARTICLE_RE, MAIN_RE):
+        match = pattern.search(html)
         if match:
             return match.group(1)
-    body = re.search(r"(?is)<body\b[^>]*>(.*?)</body>", html)
+    body = BODY_RE.search(html)
     if body:
         return body.group(1)
     return html
 
 
-def extract_article_text(html: str) -> str:
+def extract_paragraphs_regex(html: str) -> list[str]:
     block = pick_html_block(html)
-    paragraphs = re.findall(r"(?is)<p\b[^>]*>(.*?)</p>", block)
+    # Sanitizing never lengthens a paragraph, so short raw matches can be dropped unsanitized.
+    return [
+        sanitize_text(paragraph)
+        for paragraph in P_RE.findall(block)
+        if len(paragraph) >= MIN_PARAGRAPH_CHARS
+    ]
+
+
+def extract_paragraphs(html: str) -> list[str]:
+    if lxml_html is None:
+        return extract_paragraphs_regex(html)
+    try:
+        root = lxml_html.document_fromstring(html)
+    except (ValueError, lxml_etree.ParserError):
+        return extract_paragraphs_regex(html)
+
+    block = root.find(".//article")
+    if block is None:
+        block = root.find(".//main")
+    if block is None:
+        block = root.find(".//body")
+    if block is None:
+        block = root
+    return [WS_RE.sub(" ", node.text_content()).strip() for node in block.iter("p")]
+
+
+def extract_trafilatura_paragraphs(html: str) -> list[str]:
+    if trafilatura is None:
+        return []
+    text = trafilatura.extract(html, favor_recall=True, fast=True) or ""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+def clean_paragraphs(lines: list[str]) -> str:
     parts: list[str] = []
-    for paragraph in paragraphs:
-        line = sanitize_text(paragraph)
-        if len(line) < 40:
+    for line in lines:
+        if len(line) < MIN_PARAGRAPH_CHARS:
             continue
         lowered = line.lower()
         if lowered.startswith(("read also", "also read", "follow us", "for more updates")):
@@ -61,84 +224,75 @@ def extract_article_text(html: str) -> str:
     return "\n\n".join(unique_parts).strip()
 
 
-def fetch_html(url: str, timeout: int, retries: int) -> str | None:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+def extract_article_text(html: str) -> ExtractResult:
+    text = clean_paragraphs(extract_trafilatura_paragraphs(html))
+    method = "trafilatura_extract_v1"
+    if not text:
+        text = clean_paragraphs(extract_paragraphs(html))
+        method = "html_paragraph_extract_v1"
+    words = len(text.split())
+    return ExtractResult(text, words, text_state_for(words), method)
+
+
+def retry_after_seconds(response: requests.Response, default: float) -> float:
+    value = response.headers.get("Retry-After", "").strip()
+    if value.isdigit():
+        return min(float(value), MAX_BACKOFF_SECONDS)
+    return default
+
 
+def fetch_html(url: str, timeout: int, retries: int) -> str | None:
     for attempt in range(retries + 1):
+        delay = min(2**attempt, MAX_BACKOFF_SECONDS) + random.random()
         try:
-            response = requests.get(url, headers=headers, timeout=timeout, allow_redirects=True)
+            response = SESSION.get(url, timeout=timeout, allow_redirects=True)
+        except Exception:
+            response = None
+        if response is not None:
             if response.status_code == 200 and response.text:
                 return response.text
-        except Exception:
-            pass
+            if response.status_code in (429, 503):
+                delay = retry_after_seconds(response, delay)
+            elif 400 <= response.status_code < 500 and response.status_code != 408:
+                # Other client errors are permanent; retrying only burns the timeout budget.
+                return None
         if attempt < retries:
-            sleep(1.0 + attempt * 0.5)
+            sleep(delay)
     return None
 
 
-def update_article_text(
-    cur: sqlite3.Cursor,
+def fetch_and_extract(url: str, timeout: int, retries: int) -> ExtractResult | None:
+    html = fetch_html(url, timeout, retries)
+    if not html:
+        return None
+    return extract_article_text(html)
+
+
+def article_text_params(
     article_uid: str,
     source_url: str,
-    text: str,
-) -> None:
-    words = len(text.split())
-    text_state = "full" if words >= 250 else ("partial" if words > 0 else "missing")
-    existing = cur.execute(
+    result: ExtractResult,
+) -> tuple[str, str | None, str, int | None, str, str]:
+    return (
+        article_uid,
+        result.text if result.text else None,
+        result.state,
+        result.words if result.words else None,
+        result.method,
+        source_url,
+    )
+
+
+def ensure_indexes(cur: sqlite3.Cursor) -> None:
+    cur.executescript(
+        """
+        CREATE INDEX IF NOT EXISTS idx_articles_status_published
+        ON articles(status, published_at DESC, id DESC);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_article_texts_primary
+        ON article_texts(article_uid, is_primary)
+        WHERE is_primary = 1;
         """
-        SELECT id
-        FROM article_texts
-        WHERE article_uid = ? AND is_primary = 1
-        LIMIT 1
-        """,
-        (article_uid,),
-    ).fetchone()
-
-    if existing:
-        cur.execute(
-            """
-            UPDATE article_texts
-            SET
-                body_text = ?,
-                text_state = ?,
-                text_format = 'plain',
-                word_count = ?,
-                language = 'en',
-                extraction_method = 'html_paragraph_extract_v1',
-                extraction_model = NULL,
-                source_url = ?,
-                extracted_at = CURRENT_TIMESTAMP,
-                updated_at = CURRENT_TIMESTAMP
-            WHERE id = ?
-            """,
-            (text if text else None, text_state, words if words else None, source_url, int(existing["id"])),
-        )
-    else:
-        cur.execute(
-            """
-            INSERT INTO article_texts (
-                article_uid,
-                body_text,
-                text_state,
-                text_format,
-                word_count,
-                language,
-                extraction_method,
-                extraction_model,
-                source_url,
-                extracted_at,
-                is_primary
-            )
-            VALUES (?, ?, ?, 'plain', ?, 'en', 'html_paragraph_extract_v1', NULL, ?, CURRENT_TIMESTAMP, 1)
-            """,
-            (article_uid, text if text else None, text_state, words if words else None, source_url),
-        )
+    )
 
 
 def main() -> int:
@@ -171,82 +325,115 @@ def main() -> int:
         action="store_true",
         help="Preview updates without writing.",
     )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help=f"Also retry URLs previously marked {FETCH_FAILED_METHOD}.",
+    )
+    parser.add_argument(
+        "--extract-processes",
+        type=int,
+        default=0,
+        help="Extract page text in this many worker processes (0 extracts in the fetch threads).",
+    )
     args = parser.parse_args()
 
     db_path = Path(args.master_db_path)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
-    cur = conn.cursor()
-
-    rows = cur.execute(
+    conn.executescript(
         """
-        SELECT
-            a.article_uid,
-            a.canonical_url,
-            a.title,
-            COALESCE(t.text_state, 'missing') AS text_state
-        FROM articles a
-        LEFT JOIN article_texts t
-            ON t.article_uid = a.article_uid
-           AND t.is_primary = 1
-        WHERE a.status IN ('verified', 'published')
-          AND (a.canonical_url LIKE 'http://%' OR a.canonical_url LIKE 'https://%')
-          AND (
-                t.article_uid IS NULL
-             OR t.text_state <> 'full'
-             OR t.body_text IS NULL
-             OR TRIM(t.body_text) = ''
-          )
-        ORDER BY a.published_at DESC, a.id DESC
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
         """
-    ).fetchall()
+    )
+    cur = conn.cursor()
+    # Journal mode and indexes persist in the file, so a dry run leaves both alone.
+    if not args.dry_run:
+        cur.execute("PRAGMA journal_mode = WAL")
+        ensure_indexes(cur)
 
+    pending_sql = pending_rows_sql(args.retry_failed)
+    total = cur.execute(f"SELECT COUNT(*) {pending_sql}").fetchone()[0]
     batch_size = max(1, int(args.batch_size))
-    total = len(rows)
     if total == 0:
         print("No pending article text backfill rows.")
         conn.close()
         return 0
 
+    # Stream candidates from a dedicated cursor so writes on `cur` don't disturb iteration.
+    read_cur = conn.cursor()
+    rows = read_cur.execute(
+        f"""
+        SELECT
+            a.article_uid,
+            a.canonical_url,
+            COALESCE(t.text_state, 'missing') AS text_state
+        {pending_sql}
+        ORDER BY a.published_at DESC, a.id DESC
+        """
+    )
+
     updated = 0
     skipped = 0
     failed = 0
 
-    for offset in range(0, total, batch_size):
-        batch = rows[offset : offset + batch_size]
-        batch_no = (offset // batch_size) + 1
+    extract_processes = max(0, int(args.extract_processes))
+    fetch = partial(
+        fetch_html if extract_processes else fetch_and_extract,
+        timeout=int(args.timeout),
+        retries=int(args.retries),
+    )
+
+    # Extraction is CPU-bound, so it can be moved off the GIL into a process pool.
+    extract_context = ProcessPoolExecutor(max_workers=extract_processes) if extract_processes else nullcontext()
+
+    # Fetch and extract each batch concurrently; DB writes stay on the main thread.
+    with ThreadPoolExecutor(max_workers=batch_size) as executor, extract_context as extract_pool:
         batch_total = (total + batch_size - 1) // batch_size
-        print(f"Batch {batch_no}/{batch_total} | size={len(batch)}")
-
-        for row in batch:
-            article_uid = str(row["article_uid"])
-            url = str(row["canonical_url"])
-            html = fetch_html(url, timeout=int(args.timeout), retries=int(args.retries))
-            if not html:
-                failed += 1
-                print(f"  - FAIL  {article_uid} | {url}")
-                continue
-
-            body_text = extract_article_text(html)
-            words = len(body_text.split()) if body_text else 0
-            state = "full" if words >= 250 else ("partial" if words > 0 else "missing")
-            print(f"  - TEXT  {article_uid} | words={words} | state={state}")
-
-            if args.dry_run:
-                if words > 0:
+        batch_no = 0
+        while batch := list(islice(rows, batch_size)):
+            batch_no += 1
+            print(f"Batch {batch_no}/{batch_total} | size={len(batch)}")
+            pending: list[tuple[str, str | None, str, int | None, str, str]] = []
+            fetch_failures: list[tuple[str, str]] = []
+
+            texts = executor.map(fetch, [str(row["canonical_url"]) for row in batch])
+            if extract_pool is not None:
+                pages = list(texts)
+                extracted_pages = extract_pool.map(extract_article_text, [page for page in pages if page])
+                texts = [next(extracted_pages) if page else None for page in pages]
+            for row, extracted in zip(batch, texts):
+                article_uid = str(row["article_uid"])
+                url = str(row["canonical_url"])
+                if extracted is None:
+                    failed += 1
+                    print(f"  - FAIL  {article_uid} | {url}")
+                    if not args.dry_run:
+                        fetch_failures.append((article_uid, url))
+                    continue
+
+                print(f"  - TEXT  {article_uid} | words={extracted.words} | state={extracted.state}")
+
+                if args.dry_run:
+                    if extracted.words > 0:
+                        updated += 1
+                    else:
+                        skipped += 1
+                    continue
+
+                pending.append(article_text_params(article_uid, url, extracted))
+                if extracted.words > 0:
                     updated += 1
                 else:
                     skipped += 1
-                continue
-
-            update_article_text(cur, article_uid, url, body_text)
-            if words > 0:
-                updated += 1
-            else:
-                skipped += 1
 
-        if not args.dry_run:
-            conn.commit()
+            if pending or fetch_failures:
+                cur.executemany(UPSERT_TEXT_SQL, pending)
+                cur.executemany(MARK_FETCH_FAILED_SQL, fetch_failures)
+                conn.commit()
 
     print(f"Candidates: {total}")
     print(f"Updated rows: {updated}")
@@ -256,6 +443,7 @@ def main() -> int:
     if args.dry_run:
         print("Dry run: no DB changes committed.")
 
+    SESSION.close()
     conn.close()
     return 0
 
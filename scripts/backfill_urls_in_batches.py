@@ -4,10 +4,11 @@
 from __future__ import annotations
 
 import argparse
-import re
 import sqlite3
+import string
 import unicodedata
 from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
 
 MONTH_ABBR = {
@@ -27,16 +28,23 @@ MONTH_ABBR = {
 
 BASE_URL = "https://www.newindianexpress.com"
 
+# Apostrophes are dropped outright; every other non-[a-z0-9] ASCII char becomes a dash.
+SLUG_TRANS = {
+    code: ("-" if chr(code) != "'" else None)
+    for code in range(128)
+    if chr(code) not in string.ascii_lowercase + string.digits
+}
+
 
 def to_ascii(text: str) -> str:
+    if text.isascii():
+        return text
     return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
 
 
 def slugify(title: str) -> str:
-    lowered = to_ascii(title).lower()
-    lowered = lowered.replace("'", "")
-    lowered = re.sub(r"[^a-z0-9]+", "-", lowered).strip("-")
-    return lowered or "untitled"
+    dashed = to_ascii(title).lower().translate(SLUG_TRANS)
+    return "-".join(part for part in dashed.split("-") if part) or "untitled"
 
 
 def build_opinions_url(title: str, published_at: str) -> str:
@@ -55,30 +63,27 @@ def append_note(existing: str | None, note: str) -> str:
     return f"{current} | {note}"
 
 
-def fetch_target_rows(cur: sqlite3.Cursor, rewrite_heuristic: bool) -> list[sqlite3.Row]:
+def target_filter(rewrite_heuristic: bool) -> str:
     if rewrite_heuristic:
-        return cur.execute(
-            """
-            SELECT id, title, published_at, section, canonical_url, provenance_note
-            FROM articles
-            WHERE canonical_url LIKE 'urn:%'
-               OR retrieval_method = 'heuristic_url_backfill'
-            ORDER BY published_at DESC, id DESC
-            """
-        ).fetchall()
+        return "canonical_url LIKE 'urn:%' OR retrieval_method = 'heuristic_url_backfill'"
+    return "canonical_url LIKE 'urn:%'"
+
+
+def count_target_rows(cur: sqlite3.Cursor, rewrite_heuristic: bool) -> int:
+    where = target_filter(rewrite_heuristic)
+    return cur.execute(f"SELECT COUNT(*) FROM articles WHERE {where}").fetchone()[0]
+
 
+def fetch_target_rows(cur: sqlite3.Cursor, rewrite_heuristic: bool) -> sqlite3.Cursor:
+    where = target_filter(rewrite_heuristic)
     return cur.execute(
-        """
+        f"""
         SELECT id, title, published_at, section, canonical_url, provenance_note
         FROM articles
-        WHERE canonical_url LIKE 'urn:%'
+        WHERE {where}
         ORDER BY published_at DESC, id DESC
         """
-    ).fetchall()
-
-
-def chunked(items: list[sqlite3.Row], size: int) -> list[list[sqlite3.Row]]:
-    return [items[i : i + size] for i in range(0, len(items), size)]
+    )
 
 
 def main() -> int:
@@ -91,7 +96,7 @@ def main() -> int:
     parser.add_argument(
         "--batch-size",
         type=int,
-        default=5,
+        default=1000,
         help="Number of rows per transaction batch.",
     )
     parser.add_argument(
@@ -109,24 +114,39 @@ def main() -> int:
     db_path = Path(args.db_path)
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
+    )
+    # Journal mode persists in the file, so a dry run leaves it alone.
+    if not args.dry_run:
+        conn.execute("PRAGMA journal_mode = WAL")
+        conn.execute("PRAGMA synchronous = NORMAL")
     cur = conn.cursor()
 
-    rows = fetch_target_rows(cur, args.rewrite_heuristic)
-    if not rows:
+    total = count_target_rows(cur, args.rewrite_heuristic)
+    if total == 0:
         print("No missing URLs detected. Nothing to update.")
         conn.close()
         return 0
 
+    # Stream targets from a dedicated cursor so the UPDATEs on `cur` don't disturb iteration.
+    rows = fetch_target_rows(conn.cursor(), args.rewrite_heuristic)
+
     now = datetime.now(UTC).strftime("%Y-%m-%d")
     provenance_note = f"URL backfilled via title+date heuristic on {now}; verify if needed"
 
     total_updated = 0
-    batches = chunked(rows, max(args.batch_size, 1))
-    for idx, batch in enumerate(batches, start=1):
-        print(f"Batch {idx}/{len(batches)}: {len(batch)} records")
-        if not args.dry_run:
-            cur.execute("BEGIN")
-
+    batch_size = max(args.batch_size, 1)
+    batch_total = (total + batch_size - 1) // batch_size
+    idx = 0
+    while batch := list(islice(rows, batch_size)):
+        idx += 1
+        print(f"Batch {idx}/{batch_total}: {len(batch)} records")
+        params: list[tuple[str, str, str, int]] = []
         for row in batch:
             article_id = int(row["id"])
             title = str(row["title"])
@@ -135,27 +155,28 @@ def main() -> int:
             note = append_note(row["provenance_note"], provenance_note)
 
             print(f"  - {article_id}: {published_at} -> {url}")
-            if not args.dry_run:
-                cur.execute(
-                    """
-                    UPDATE articles
-                    SET
-                        canonical_url = ?,
-                        retrieval_method = 'heuristic_url_backfill',
-                        source_capture_date = COALESCE(source_capture_date, ?),
-                        provenance_note = ?,
-                        updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                    """,
-                    (url, now, note, article_id),
-                )
-                total_updated += 1
+            params.append((url, now, note, article_id))
 
         if not args.dry_run:
+            cur.execute("BEGIN")
+            cur.executemany(
+                """
+                UPDATE articles
+                SET
+                    canonical_url = ?,
+                    retrieval_method = 'heuristic_url_backfill',
+                    source_capture_date = COALESCE(source_capture_date, ?),
+                    provenance_note = ?,
+                    updated_at = CURRENT_TIMESTAMP
+                WHERE id = ?
+                """,
+                params,
+            )
             conn.commit()
+            total_updated += len(params)
 
     if args.dry_run:
-        print(f"Dry run complete. Missing URL rows previewed: {len(rows)}")
+        print(f"Dry run complete. Missing URL rows previewed: {total}")
     else:
         remaining = cur.execute(
             "SELECT COUNT(*) FROM articles WHERE canonical_url LIKE 'urn:%'"
@@ -7,9 +7,15 @@ import argparse
 import csv
 import re
 import sqlite3
+import string
 import unicodedata
 from pathlib import Path
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 
 KEYWORD_TAGS: dict[str, list[str]] = {
     "anthropocene": ["ecology", "technology-and-society"],
@@ -52,28 +58,58 @@ FALLBACK_TAG_SLUGS = [
     "culture-and-modernity",
 ]
 
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+SLUG_TRANS = {
+    code: "-"
+    for code in range(128)
+    if chr(code) not in string.ascii_lowercase + string.digits
+}
+WS_RE = re.compile(r"\s+")
+
+
+def build_keyword_automaton():
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for keyword in KEYWORD_TAGS:
+        automaton.add_word(keyword, keyword)
+    automaton.make_automaton()
+    return automaton
+
+
+KEYWORD_AUTOMATON = build_keyword_automaton()
+
 
 def to_ascii(text: str) -> str:
+    if text.isascii():
+        return text
     return unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode("ascii")
 
 
 def slugify(value: str) -> str:
-    value = to_ascii(value).lower()
-    value = re.sub(r"[^a-z0-9]+", "-", value).strip("-")
-    return value or "untitled"
+    dashed = to_ascii(value).lower().translate(SLUG_TRANS)
+    return "-".join(part for part in dashed.split("-") if part) or "untitled"
 
 
 def normalize_title(title: str) -> str:
     lowered = to_ascii(title).lower()
-    lowered = re.sub(r"[^a-z0-9]+", " ", lowered)
-    return re.sub(r"\s+", " ", lowered).strip()
+    lowered = NON_ALNUM_RE.sub(" ", lowered)
+    return WS_RE.sub(" ", lowered).strip()
+
+
+def matched_keywords(lowered: str) -> set[str]:
+    if KEYWORD_AUTOMATON is None:
+        return {keyword for keyword in KEYWORD_TAGS if keyword in lowered}
+    return {keyword for _, keyword in KEYWORD_AUTOMATON.iter(lowered)}
 
 
 def infer_tag_slugs(title: str) -> list[str]:
     lowered = to_ascii(title).lower()
+    matched = matched_keywords(lowered)
     chosen: list[str] = []
+    # Walk KEYWORD_TAGS in declaration order so tag priority does not depend on match position.
     for keyword, slugs in KEYWORD_TAGS.items():
-        if keyword in lowered:
+        if keyword in matched:
             for slug in slugs:
                 if slug not in chosen:
                     chosen.append(slug)
@@ -98,6 +134,33 @@ def load_sql(path: Path) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def ensure_staging_tables(cur: sqlite3.Cursor) -> None:
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS stage_articles (
+            seq INTEGER PRIMARY KEY,
+            canonical_url TEXT NOT NULL,
+            section TEXT NOT NULL,
+            title TEXT NOT NULL,
+            normalized_title TEXT,
+            published_at TEXT NOT NULL,
+            read_minutes INTEGER,
+            summary TEXT,
+            capture_date TEXT,
+            note TEXT
+        )
+        """
+    )
+    cur.execute(
+        """
+        CREATE TEMP TABLE IF NOT EXISTS stage_tags (
+            canonical_url TEXT NOT NULL,
+            slug TEXT NOT NULL
+        )
+        """
+    )
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(description=__doc__)
     parser.add_argument(
@@ -131,6 +194,8 @@ def main() -> int:
 
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
     cur = conn.cursor()
 
     cur.executescript(load_sql(schema_sql))
@@ -142,12 +207,11 @@ def main() -> int:
         for row in cur.execute("SELECT id, slug FROM tags").fetchall()
     }
 
-    imported = 0
-    tagged_links = 0
-
+    stage_articles: list[tuple] = []
+    stage_tags: list[tuple[str, str]] = []
     with seed_csv.open("r", encoding="utf-8", newline="") as f:
         reader = csv.DictReader(f)
-        for row in reader:
+        for seq, row in enumerate(reader):
             title = row["title"].strip()
             published_at = row["published_at"].strip()
             section = row.get("section", "Opinion").strip() or "Opinion"
@@ -159,82 +223,103 @@ def main() -> int:
                 f"urn:tnie:shiv:{published_at}:{slugify(title)}"
             )
 
-            cur.execute(
-                """
-                INSERT INTO articles (
-                    publication_id,
-                    canonical_url,
-                    section,
-                    title,
-                    normalized_title,
-                    author_name,
-                    published_at,
-                    reading_minutes,
-                    summary,
-                    summary_method,
-                    retrieval_method,
-                    source_capture_date,
-                    provenance_note,
-                    status
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(canonical_url) DO UPDATE SET
-                    section = excluded.section,
-                    title = excluded.title,
-                    normalized_title = excluded.normalized_title,
-                    published_at = excluded.published_at,
-                    reading_minutes = excluded.reading_minutes,
-                    summary = excluded.summary,
-                    summary_method = excluded.summary_method,
-                    retrieval_method = excluded.retrieval_method,
-                    source_capture_date = excluded.source_capture_date,
-                    provenance_note = excluded.provenance_note,
-                    updated_at = CURRENT_TIMESTAMP
-                """,
+            stage_articles.append(
                 (
-                    1,
+                    seq,
                     canonical_url,
                     section,
                     title,
                     normalize_title(title),
-                    "Shiv Visvanathan",
                     published_at,
                     read_minutes,
                     build_summary(title, section),
-                    "heuristic_title",
-                    "ctrl_a_copy",
                     capture_date,
                     note,
-                    "draft",
-                ),
-            )
-
-            article_id = cur.execute(
-                "SELECT id FROM articles WHERE canonical_url = ?",
-                (canonical_url,),
-            ).fetchone()["id"]
-
-            tag_slugs = infer_tag_slugs(title)
-            for slug in tag_slugs:
-                tag_id = tag_ids.get(slug)
-                if tag_id is None:
-                    continue
-                cur.execute(
-                    """
-                    INSERT OR IGNORE INTO article_tags (
-                        article_id,
-                        tag_id,
-                        confidence,
-                        method
-                    )
-                    VALUES (?, ?, ?, ?)
-                    """,
-                    (article_id, tag_id, 0.62, "keyword"),
                 )
-                tagged_links += 1
+            )
+            stage_tags.extend(
+                (canonical_url, slug) for slug in infer_tag_slugs(title) if slug in tag_ids
+            )
 
-            imported += 1
+    imported = len(stage_articles)
+    tagged_links = len(stage_tags)
 
+    cur.execute("BEGIN")
+    ensure_staging_tables(cur)
+    cur.executemany(
+        "INSERT INTO stage_articles VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+        stage_articles,
+    )
+    cur.executemany("INSERT INTO stage_tags VALUES (?, ?)", stage_tags)
+
+    # Rows are applied in CSV order, so a repeated canonical_url still ends with its last row.
+    cur.execute(
+        """
+        INSERT INTO articles (
+            publication_id,
+            canonical_url,
+            section,
+            title,
+            normalized_title,
+            author_name,
+            published_at,
+            reading_minutes,
+            summary,
+            summary_method,
+            retrieval_method,
+            source_capture_date,
+            provenance_note,
+            status
+        )
+        SELECT
+            1,
+            canonical_url,
+            section,
+            title,
+            normalized_title,
+            'Shiv Visvanathan',
+            published_at,
+            read_minutes,
+            summary,
+            'heuristic_title',
+            'ctrl_a_copy',
+            capture_date,
+            note,
+            'draft'
+        FROM stage_articles
+        WHERE true
+        ORDER BY seq
+        ON CONFLICT(canonical_url) DO UPDATE SET
+            section = excluded.section,
+            title = excluded.title,
+            normalized_title = excluded.normalized_title,
+            published_at = excluded.published_at,
+            reading_minutes = excluded.reading_minutes,
+            summary = excluded.summary,
+            summary_method = excluded.summary_method,
+            retrieval_method = excluded.retrieval_method,
+            source_capture_date = excluded.source_capture_date,
+            provenance_note = excluded.provenance_note,
+            updated_at = CURRENT_TIMESTAMP
+        """
+    )
+    cur.execute(
+        """
+        INSERT OR IGNORE INTO article_tags (
+            article_id,
+            tag_id,
+            confidence,
+            method
+        )
+        SELECT a.id, t.id, 0.62, 'keyword'
+        FROM stage_tags s
+        JOIN articles a ON a.canonical_url = s.canonical_url
+        JOIN tags t ON t.slug = s.slug
+        ORDER BY s.rowid
+        """
+    )
+    cur.execute("DROP TABLE stage_articles")
+    cur.execute("DROP TABLE stage_tags")
     conn.commit()
 
     article_count = cur.execute("SELECT COUNT(*) AS c FROM articles").fetchone()["c"]
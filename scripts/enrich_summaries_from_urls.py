@@ -4,15 +4,49 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import hashlib
 import re
 import sqlite3
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
+from functools import lru_cache, partial
 from html import unescape
 from html.parser import HTMLParser
 from pathlib import Path
-from time import sleep
+from time import sleep, time
+from typing import NamedTuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+HEAD_RE = re.compile(rb"<head\b[^>]*>(.*?)</head>", re.IGNORECASE | re.DOTALL)
+HEAD_END_RE = re.compile(rb"</head\s*>", re.IGNORECASE)
+META_TAG_RE = re.compile(rb"""<meta\b((?:[^>"']|"[^"]*"|'[^']*')*)>""", re.IGNORECASE)
+META_ATTR_RE = re.compile(rb"""([^\s"'>/=]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+TNIE_URL_RE = re.compile(r"https://www\.newindianexpress\.com/[A-Za-z0-9\-_/\.]+")
+SLUG_TOKEN_RE = re.compile(r"[a-z0-9]+")
+CHARSET_RE = re.compile(r"""charset\s*=\s*["']?([\w.:-]+)""", re.IGNORECASE)
+
+FAILURE_BACKOFF_SECONDS = 86400
+FAILURE_BACKOFF_MAX_SECONDS = 30 * 86400
+SUMMARY_MEMO_SIZE = 4096
+HEAD_CHUNK_BYTES = 65536
+HEAD_MAX_BYTES = 262144
+DRAIN_MAX_BYTES = HEAD_CHUNK_BYTES
+
+
+class FetchedPage(NamedTuple):
+    summary: str | None
+    etag: str | None
+    last_modified: str | None
 
 
 class MetaDescriptionParser(HTMLParser):
@@ -41,6 +75,12 @@ class MetaDescriptionParser(HTMLParser):
             self.description = content
 
 
+SECTION_PATHS = {
+    "opinion": ("/opinion/", "/opinions/"),
+    "columns": ("/columns/",),
+    "magazine": ("/magazine/",),
+}
+
 MONTH_ABBR = {
     "01": "Jan",
     "02": "Feb",
@@ -56,6 +96,24 @@ MONTH_ABBR = {
     "12": "Dec",
 }
 
+HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+    ),
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+# Nearly every request goes to the same TNIE host, so keep its connections alive across rows.
+SESSION = requests.Session()
+SESSION.headers.update(HEADERS)
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=0))
+
+# Several canonical URLs can redirect to the same page; remember summaries by body hash for the run.
+SUMMARY_MEMO: OrderedDict[tuple[bytes | int, str], str | None] = OrderedDict()
+SUMMARY_MEMO_LOCK = threading.Lock()
+
 
 def append_note(existing: str | None, note: str) -> str:
     current = (existing or "").strip()
@@ -72,10 +130,7 @@ def normalize_summary(text: str) -> str:
     return clean.strip()
 
 
-def extract_summary(html_text: str) -> str | None:
-    parser = MetaDescriptionParser()
-    parser.feed(html_text)
-    candidate = parser.og_description or parser.description
+def finalize_summary(candidate: str | None) -> str | None:
     if not candidate:
         return None
     summary = normalize_summary(candidate)
@@ -84,27 +139,119 @@ def extract_summary(html_text: str) -> str | None:
     return summary
 
 
-def fetch_summary(url: str, timeout: int, retries: int) -> str | None:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-    }
+def extract_summary(html_text: str) -> str | None:
+    parser = MetaDescriptionParser()
+    parser.feed(html_text)
+    return finalize_summary(parser.og_description or parser.description)
+
+
+def scan_head_meta(head: bytes, encoding: str) -> str | None:
+    description: str | None = None
+    for tag in META_TAG_RE.finditer(head):
+        attr_map: dict[bytes, bytes] = {}
+        for match in META_ATTR_RE.finditer(tag.group(1)):
+            attr_map[match.group(1).lower()] = match.group(2) or match.group(3) or match.group(4) or b""
+        content = unescape(attr_map.get(b"content", b"").decode(encoding, "replace")).strip()
+        if not content:
+            continue
+        prop = attr_map.get(b"property", b"").decode("ascii", "replace").lower().strip()
+        name = attr_map.get(b"name", b"").decode("ascii", "replace").lower().strip()
+        if prop == "og:description":
+            return content
+        if name == "description" and description is None:
+            description = content
+    return description
+
+
+def extract_summary_from_bytes(body: bytes, encoding: str) -> str | None:
+    # Only the <head> meta tags matter; fall back to the full parser when the fast scan misses.
+    head = HEAD_RE.search(body)
+    if head:
+        summary = finalize_summary(scan_head_meta(head.group(1), encoding))
+        if summary:
+            return summary
+    return extract_summary(body.decode(encoding, "replace"))
+
+
+def response_encoding(response: requests.Response) -> str:
+    # Decode with the declared charset or UTF-8 (what TNIE serves); never run requests' detection.
+    match = CHARSET_RE.search(response.headers.get("Content-Type", ""))
+    if match:
+        try:
+            return codecs.lookup(match.group(1)).name
+        except LookupError:
+            pass
+    return "utf-8"
+
+
+def read_head_bytes(response: requests.Response) -> bytes:
+    # The summary lives in <head>, so stop downloading once it has been closed.
+    body = b""
+    for chunk in response.iter_content(chunk_size=HEAD_CHUNK_BYTES):
+        body += chunk
+        if HEAD_END_RE.search(body, max(0, len(body) - len(chunk) - 16)) or len(body) >= HEAD_MAX_BYTES:
+            break
+    return body
+
+
+def drain_body(response: requests.Response) -> None:
+    # Pages that end within a short tail are finished so the keep-alive connection goes back to the pool;
+    # anything longer is closed unread, since skipping the rest of the page is the point of the head-only read.
+    length = response.headers.get("Content-Length", "")
+    if length.isdigit() and int(length) - response.raw.tell() > DRAIN_MAX_BYTES:
+        return
+    drained = 0
+    for chunk in response.iter_content(chunk_size=HEAD_CHUNK_BYTES):
+        drained += len(chunk)
+        if drained >= DRAIN_MAX_BYTES:
+            break
+
+
+def body_digest(body: bytes) -> bytes | int:
+    if xxhash is not None:
+        return xxhash.xxh3_64_intdigest(body)
+    return hashlib.blake2b(body, digest_size=16).digest()
+
+
+def memoized_summary_from_bytes(body: bytes, encoding: str) -> str | None:
+    key = (body_digest(body), encoding)
+    with SUMMARY_MEMO_LOCK:
+        if key in SUMMARY_MEMO:
+            SUMMARY_MEMO.move_to_end(key)
+            return SUMMARY_MEMO[key]
+    summary = extract_summary_from_bytes(body, encoding)
+    with SUMMARY_MEMO_LOCK:
+        SUMMARY_MEMO[key] = summary
+        if len(SUMMARY_MEMO) > SUMMARY_MEMO_SIZE:
+            SUMMARY_MEMO.popitem(last=False)
+    return summary
+
+
+def fetch_page(url: str, timeout: int, retries: int, cached: sqlite3.Row | None = None) -> FetchedPage | None:
+    headers: dict[str, str] = {}
+    if cached is not None:
+        if cached["etag"]:
+            headers["If-None-Match"] = cached["etag"]
+        if cached["last_modified"]:
+            headers["If-Modified-Since"] = cached["last_modified"]
 
     attempt = 0
     while attempt <= retries:
         try:
-            response = requests.get(
-                url,
-                headers=headers,
-                timeout=timeout,
-                allow_redirects=True,
-            )
-            if response.status_code != 200:
-                raise RuntimeError(f"HTTP {response.status_code}")
-            return extract_summary(response.text)
+            with SESSION.get(
+                url, headers=headers, timeout=timeout, allow_redirects=True, stream=True
+            ) as response:
+                if response.status_code == 304 and cached is not None:
+                    return FetchedPage(cached["summary"], cached["etag"], cached["last_modified"])
+                if response.status_code != 200:
+                    raise RuntimeError(f"HTTP {response.status_code}")
+                head = read_head_bytes(response)
+                drain_body(response)
+                return FetchedPage(
+                    memoized_summary_from_bytes(head, response_encoding(response)),
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                )
         except Exception:
             if attempt >= retries:
                 return None
@@ -113,15 +260,21 @@ def fetch_summary(url: str, timeout: int, retries: int) -> str | None:
     return None
 
 
-def slug_tokens(text: str) -> set[str]:
+def fetch_summary(url: str, timeout: int, retries: int) -> str | None:
+    page = fetch_page(url, timeout, retries)
+    return page.summary if page else None
+
+
+@lru_cache(maxsize=1024)
+def slug_tokens(text: str) -> frozenset[str]:
     text = unescape(text).lower()
     text = text.replace("'", "")
-    parts = re.findall(r"[a-z0-9]+", text)
-    return {p for p in parts if len(p) > 2}
+    parts = SLUG_TOKEN_RE.findall(text)
+    return frozenset(p for p in parts if len(p) > 2)
 
 
 def extract_candidate_links(search_html: str) -> list[str]:
-    urls = re.findall(r"https://www\.newindianexpress\.com/[A-Za-z0-9\-_/\.]+", search_html)
+    urls = TNIE_URL_RE.findall(search_html)
     seen: set[str] = set()
     out: list[str] = []
     for url in urls:
@@ -133,72 +286,185 @@ def extract_candidate_links(search_html: str) -> list[str]:
     return out
 
 
-def resolve_canonical_url_from_search(
-    title: str,
-    published_at: str,
-    section: str,
-    timeout: int,
-    retries: int,
-) -> str | None:
-    headers = {
-        "User-Agent": (
-            "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-            "AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
-        ),
-        "Accept-Language": "en-US,en;q=0.9",
-    }
-
+def pick_search_candidate(title: str, published_at: str, section: str, candidates: list[str]) -> str | None:
     year, month, day = published_at.split("-")
     month_abbr = MONTH_ABBR[month]
-    date_fragment = f"/{year}/{month_abbr}/{day}/"
+    date_fragment = f"/{year}/{month_abbr}/{day}/".lower()
+
+    title_tokens = slug_tokens(title)
+    section_paths = SECTION_PATHS.get(section.strip().lower(), ())
+
+    scored: list[tuple[int, str]] = []
+    for url in candidates:
+        score = 0
+        lower_url = url.lower()
+        if date_fragment in lower_url:
+            score += 8
+        if any(path in lower_url for path in section_paths):
+            score += 3
+
+        url_slug = lower_url.rsplit("/", 1)[-1]
+        # Exact shared-token count: the score gates whether canonical_url gets rewritten.
+        score += len(title_tokens & slug_tokens(url_slug))
+
+        scored.append((score, url))
+
+    scored.sort(key=lambda item: item[0], reverse=True)
+    best_score, best_url = scored[0]
+    if best_score <= 4:
+        return None
+    return best_url
 
+
+def search_candidates(title: str, timeout: int, retries: int) -> list[str]:
     query = requests.utils.quote(title)
     search_url = f"https://www.newindianexpress.com/search?q={query}"
 
     attempt = 0
     while attempt <= retries:
         try:
-            response = requests.get(search_url, headers=headers, timeout=timeout, allow_redirects=True)
+            response = SESSION.get(search_url, timeout=timeout, allow_redirects=True)
             if response.status_code != 200:
                 raise RuntimeError(f"search HTTP {response.status_code}")
-            candidates = extract_candidate_links(response.text)
-            if not candidates:
-                return None
-
-            title_tok = slug_tokens(title)
-            section_l = section.strip().lower()
-
-            scored: list[tuple[int, str]] = []
-            for url in candidates:
-                score = 0
-                lower_url = url.lower()
-                if date_fragment.lower() in lower_url:
-                    score += 8
-                if section_l == "opinion" and ("/opinion/" in lower_url or "/opinions/" in lower_url):
-                    score += 3
-                if section_l == "columns" and "/columns/" in lower_url:
-                    score += 3
-                if section_l == "magazine" and "/magazine/" in lower_url:
-                    score += 3
-
-                url_slug = lower_url.rsplit("/", 1)[-1]
-                shared = len(title_tok.intersection(slug_tokens(url_slug)))
-                score += shared
-
-                scored.append((score, url))
-
-            scored.sort(key=lambda item: item[0], reverse=True)
-            best_score, best_url = scored[0]
-            if best_score <= 4:
-                return None
-            return best_url
+            return extract_candidate_links(response.content.decode(response_encoding(response), "replace"))
         except Exception:
             if attempt >= retries:
-                return None
+                return []
             sleep(1.0 + attempt * 0.5)
             attempt += 1
 
-    return None
+    return []
+
+
+def fetch_row_summary(
+    item: tuple[sqlite3.Row, sqlite3.Row | None, list[str]],
+    timeout: int,
+    retries: int,
+    resolve_search: bool,
+) -> tuple[str | None, str | None, FetchedPage | None, list[str]]:
+    row, cached, local_candidates = item
+    url = str(row["canonical_url"])
+    page = fetch_page(url, timeout=timeout, retries=retries, cached=cached)
+    summary = page.summary if page else None
+    resolved_url: str | None = None
+    search_links: list[str] = []
+    if not summary and resolve_search:
+        title = str(row["title"])
+        published_at = str(row["published_at"])
+        section = str(row["section"] or "Opinion")
+        # Links remembered from earlier TNIE searches are tried before another search round trip.
+        if local_candidates:
+            resolved_url = pick_search_candidate(title, published_at, section, local_candidates)
+        if not resolved_url:
+            search_links = search_candidates(title, timeout=timeout, retries=retries)
+            if search_links:
+                resolved_url = pick_search_candidate(title, published_at, section, search_links)
+        if resolved_url and resolved_url != url:
+            summary = fetch_summary(resolved_url, timeout=timeout, retries=retries)
+    return summary, resolved_url, page, search_links
+
+
+def ensure_tables(cur: sqlite3.Cursor) -> None:
+    cur.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS summary_fetch_cache (
+            url TEXT PRIMARY KEY,
+            etag TEXT,
+            last_modified TEXT,
+            summary TEXT,
+            fetched_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        );
+
+        CREATE TABLE IF NOT EXISTS fetch_failures (
+            url TEXT PRIMARY KEY,
+            first_failed_at INTEGER NOT NULL,
+            last_attempt_at INTEGER NOT NULL,
+            attempts INTEGER NOT NULL DEFAULT 1,
+            reason TEXT
+        );
+        """
+    )
+
+
+def load_fetch_cache(cur: sqlite3.Cursor, urls: list[str]) -> dict[str, sqlite3.Row]:
+    placeholders = ", ".join("?" for _ in urls)
+    rows = cur.execute(
+        f"""
+        SELECT url, etag, last_modified, summary
+        FROM summary_fetch_cache
+        WHERE url IN ({placeholders})
+        """,
+        urls,
+    ).fetchall()
+    return {str(row["url"]): row for row in rows}
+
+
+def load_backed_off_urls(cur: sqlite3.Cursor, urls: list[str], now: int) -> set[str]:
+    placeholders = ", ".join("?" for _ in urls)
+    rows = cur.execute(
+        f"""
+        SELECT url, last_attempt_at, attempts
+        FROM fetch_failures
+        WHERE url IN ({placeholders})
+        """,
+        urls,
+    ).fetchall()
+    # The first failure waits one back-off period; each further consecutive failure doubles it.
+    return {
+        str(row["url"])
+        for row in rows
+        if now - int(row["last_attempt_at"])
+        < min(FAILURE_BACKOFF_SECONDS * 2 ** (int(row["attempts"]) - 1), FAILURE_BACKOFF_MAX_SECONDS)
+    }
+
+
+def ensure_search_index(cur: sqlite3.Cursor) -> bool:
+    try:
+        cur.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS search_links (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                slug TEXT NOT NULL,
+                seen_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+            );
+
+            CREATE VIRTUAL TABLE IF NOT EXISTS search_links_fts USING fts5(
+                slug,
+                content = 'search_links',
+                content_rowid = 'id',
+                tokenize = 'unicode61 remove_diacritics 2'
+            );
+
+            CREATE TRIGGER IF NOT EXISTS search_links_after_insert AFTER INSERT ON search_links
+            BEGIN
+                INSERT INTO search_links_fts (rowid, slug) VALUES (new.id, new.slug);
+            END;
+            """
+        )
+    except sqlite3.OperationalError:
+        # SQLite built without FTS5: always fall back to the TNIE search.
+        return False
+    return True
+
+
+def local_search_candidates(cur: sqlite3.Cursor, title: str) -> list[str]:
+    tokens = slug_tokens(title)
+    if not tokens:
+        return []
+    rows = cur.execute(
+        """
+        SELECT l.url
+        FROM search_links_fts f
+        JOIN search_links l ON l.id = f.rowid
+        WHERE search_links_fts MATCH ?
+          AND l.url NOT IN (SELECT canonical_url FROM articles)
+        ORDER BY bm25(search_links_fts)
+        LIMIT 5
+        """,
+        (" OR ".join(f'"{token}"' for token in sorted(tokens)),),
+    ).fetchall()
+    return [str(row["url"]) for row in rows]
 
 
 def chunked(rows: list[sqlite3.Row], size: int) -> list[list[sqlite3.Row]]:
@@ -260,6 +526,12 @@ def main() -> int:
         default=2,
         help="HTTP retry count per URL.",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Concurrent HTTP fetches per batch.",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -270,11 +542,32 @@ def main() -> int:
         action="store_true",
         help="Try TNIE search-based canonical URL recovery when direct summary fetch fails.",
     )
+    parser.add_argument(
+        "--retry-failed",
+        action="store_true",
+        help="Ignore the failure back-off and refetch URLs that failed recently.",
+    )
     args = parser.parse_args()
 
     conn = sqlite3.connect(Path(args.db_path))
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
+    )
     cur = conn.cursor()
+    # Journal mode and the cache/search tables persist in the file; a dry run only reads what already exists.
+    if not args.dry_run:
+        cur.execute("PRAGMA journal_mode = WAL")
+        ensure_tables(cur)
+        if args.resolve_search:
+            ensure_search_index(cur)
+    tables = {str(row[0]) for row in cur.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    has_search_index = args.resolve_search and "search_links_fts" in tables
 
     rows = select_targets(cur, args.only_heuristic, args.limit)
     if not rows:
@@ -292,92 +585,161 @@ def main() -> int:
     updated = 0
     failed = 0
     skipped = 0
+    deferred = 0
     processed = 0
     resolved_url_updates = 0
 
-    batches = chunked(rows, max(args.batch_size, 1))
+    fetch = partial(
+        fetch_row_summary,
+        timeout=max(args.timeout, 5),
+        retries=max(args.retries, 0),
+        resolve_search=args.resolve_search,
+    )
     print(f"Target rows: {len(rows)}")
-    for index, batch in enumerate(batches, start=1):
-        print(f"Batch {index}/{len(batches)}: {len(batch)} records")
-
-        if not args.dry_run:
-            cur.execute("BEGIN")
-
-        for row in batch:
-            article_id = int(row["id"])
-            title = str(row["title"])
-            section = str(row["section"] or "Opinion")
-            url = str(row["canonical_url"])
-            published_at = str(row["published_at"])
-            processed += 1
-
-            summary = fetch_summary(url, timeout=max(args.timeout, 5), retries=max(args.retries, 0))
-            resolved_url: str | None = None
-            if not summary and args.resolve_search:
-                resolved_url = resolve_canonical_url_from_search(
-                    title=title,
-                    published_at=published_at,
-                    section=section,
-                    timeout=max(args.timeout, 5),
-                    retries=max(args.retries, 0),
-                )
-                if resolved_url and resolved_url != url:
-                    summary = fetch_summary(
-                        resolved_url, timeout=max(args.timeout, 5), retries=max(args.retries, 0)
+    with ThreadPoolExecutor(max_workers=max(args.workers, 1)) as executor:
+        batches = chunked(rows, max(args.batch_size, 1))
+        for index, batch in enumerate(batches, start=1):
+            print(f"Batch {index}/{len(batches)}: {len(batch)} records")
+
+            # Fetch the whole batch concurrently, then apply results in row order.
+            # Cached validators let unchanged pages come back as 304 without a body.
+            # URLs that failed recently are not refetched until their back-off expires.
+            urls = [str(row["canonical_url"]) for row in batch]
+            now = int(time())
+            cache = load_fetch_cache(cur, urls) if "summary_fetch_cache" in tables else {}
+            if args.retry_failed or "fetch_failures" not in tables:
+                backed_off = set()
+            else:
+                backed_off = load_backed_off_urls(cur, urls, now)
+            fetched = executor.map(
+                fetch,
+                [
+                    (
+                        row,
+                        cache.get(url),
+                        local_search_candidates(cur, str(row["title"])) if has_search_index else [],
                     )
-
-            if not summary:
-                failed += 1
-                print(f"  - FAIL {article_id} | {published_at} | {title}")
-                continue
-
-            if len(summary) < 35:
-                skipped += 1
-                print(f"  - SKIP {article_id} | summary too short")
-                continue
-
-            print(f"  - OK   {article_id} | {published_at} | {title}")
-            print(f"      {summary[:150]}{'...' if len(summary) > 150 else ''}")
-
-            if args.dry_run:
-                updated += 1
-                continue
-
-            provenance_note = append_note(row["provenance_note"], provenance_marker)
-            canonical_url = resolved_url if resolved_url else url
-            cur.execute(
-                """
-                UPDATE articles
-                SET
-                  canonical_url = ?,
-                  summary = ?,
-                  summary_method = 'meta_description',
-                  summary_model = 'tnie-og-description',
-                  provenance_note = ?,
-                  updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-                """,
-                (canonical_url, summary, provenance_note, article_id),
-            )
-            cur.execute(
-                """
-                INSERT INTO article_notes (article_id, note_type, body)
-                VALUES (?, 'qa', ?)
-                """,
-                (article_id, note_body),
+                    for row, url in zip(batch, urls)
+                    if url not in backed_off
+                ],
             )
-            if resolved_url and resolved_url != url:
-                resolved_url_updates += 1
-            updated += 1
+            results = [(None, None, None, []) if url in backed_off else next(fetched) for url in urls]
+
+            updates: list[tuple[str, str, str, int]] = []
+            notes: list[tuple[int, str]] = []
+            failures: list[tuple[str, int, int, str]] = []
+            recovered: list[tuple[str]] = []
+            cache_rows = [
+                (str(row["canonical_url"]), page.etag, page.last_modified, page.summary)
+                for row, (_, _, page, _) in zip(batch, results)
+                if page and (page.etag or page.last_modified)
+            ]
+            link_rows = {
+                link: " ".join(sorted(slug_tokens(link.rsplit("/", 1)[-1])))
+                for _, _, _, search_links in results
+                for link in search_links
+            }
+            for row, (summary, resolved_url, page, _) in zip(batch, results):
+                article_id = int(row["id"])
+                title = str(row["title"])
+                url = str(row["canonical_url"])
+                published_at = str(row["published_at"])
+                processed += 1
+
+                if url in backed_off:
+                    deferred += 1
+                    print(f"  - WAIT {article_id} | failed recently, backing off")
+                    continue
+
+                if not summary:
+                    failed += 1
+                    print(f"  - FAIL {article_id} | {published_at} | {title}")
+                    reason = "no_meta_description" if page else "fetch_error"
+                    failures.append((url, now, now, reason))
+                    continue
+
+                recovered.append((url,))
+
+                if len(summary) < 35:
+                    skipped += 1
+                    print(f"  - SKIP {article_id} | summary too short")
+                    continue
+
+                print(f"  - OK   {article_id} | {published_at} | {title}")
+                print(f"      {summary[:150]}{'...' if len(summary) > 150 else ''}")
+
+                if args.dry_run:
+                    updated += 1
+                    continue
+
+                provenance_note = append_note(row["provenance_note"], provenance_marker)
+                canonical_url = resolved_url if resolved_url else url
+                updates.append((canonical_url, summary, provenance_note, article_id))
+                notes.append((article_id, note_body))
+                if resolved_url and resolved_url != url:
+                    resolved_url_updates += 1
+                updated += 1
 
-        if not args.dry_run:
-            conn.commit()
+            if not args.dry_run:
+                cur.execute("BEGIN")
+                cur.executemany(
+                    """
+                    UPDATE articles
+                    SET
+                      canonical_url = ?,
+                      summary = ?,
+                      summary_method = 'meta_description',
+                      summary_model = 'tnie-og-description',
+                      provenance_note = ?,
+                      updated_at = CURRENT_TIMESTAMP
+                    WHERE id = ?
+                    """,
+                    updates,
+                )
+                cur.executemany(
+                    """
+                    INSERT INTO article_notes (article_id, note_type, body)
+                    VALUES (?, 'qa', ?)
+                    """,
+                    notes,
+                )
+                cur.executemany(
+                    """
+                    INSERT INTO summary_fetch_cache (url, etag, last_modified, summary)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                      etag = excluded.etag,
+                      last_modified = excluded.last_modified,
+                      summary = excluded.summary,
+                      fetched_at = CURRENT_TIMESTAMP
+                    """,
+                    cache_rows,
+                )
+                cur.executemany(
+                    """
+                    INSERT INTO fetch_failures (url, first_failed_at, last_attempt_at, reason)
+                    VALUES (?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                      last_attempt_at = excluded.last_attempt_at,
+                      attempts = fetch_failures.attempts + 1,
+                      reason = excluded.reason
+                    """,
+                    failures,
+                )
+                cur.executemany("DELETE FROM fetch_failures WHERE url = ?", recovered)
+                if has_search_index:
+                    cur.executemany(
+                        "INSERT OR IGNORE INTO search_links (url, slug) VALUES (?, ?)",
+                        link_rows.items(),
+                    )
+                conn.commit()
 
     print(f"Processed: {processed}")
     print(f"Updated: {updated}")
     print(f"Resolved canonical URLs: {resolved_url_updates}")
     print(f"Failed fetch/extract: {failed}")
     print(f"Skipped: {skipped}")
+    print(f"Deferred (recent failure): {deferred}")
 
     if not args.dry_run:
         counts = cur.execute(
@@ -396,6 +758,7 @@ def main() -> int:
             f"heuristic_title: {counts['heuristic_left']}"
         )
 
+    SESSION.close()
     conn.close()
     return 0
 
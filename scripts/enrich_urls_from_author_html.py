@@ -11,6 +11,12 @@ import unicodedata
 from pathlib import Path
 
 BASE_URL = "https://www.newindianexpress.com"
+HTTP_PREFIXES = ("http://", "https://")
+
+ANCHOR_RE = re.compile(r"""<a\b[^>]*href=(['"])(.*?)\1[^>]*>(.*?)</a>""", re.IGNORECASE | re.DOTALL)
+TAG_RE = re.compile(r"<[^>]+>")
+NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+WS_RE = re.compile(r"\s+")
 
 
 def to_ascii(text: str) -> str:
@@ -19,17 +25,13 @@ def to_ascii(text: str) -> str:
 
 def normalize_title(title: str) -> str:
     cleaned = to_ascii(title).lower()
-    cleaned = re.sub(r"<[^>]+>", " ", cleaned)
-    cleaned = re.sub(r"[^a-z0-9]+", " ", cleaned)
-    return re.sub(r"\s+", " ", cleaned).strip()
+    cleaned = TAG_RE.sub(" ", cleaned)
+    cleaned = NON_ALNUM_RE.sub(" ", cleaned)
+    return WS_RE.sub(" ", cleaned).strip()
 
 
-def extract_title_links(html_text: str) -> dict[str, str]:
-    anchors = re.findall(
-        r"""<a\b[^>]*href=(['"])(.*?)\1[^>]*>(.*?)</a>""",
-        html_text,
-        flags=re.IGNORECASE | re.DOTALL,
-    )
+def extract_title_links(html_text: str, needed: set[str] | None = None) -> dict[str, str]:
+    anchors = ANCHOR_RE.findall(html_text)
     title_to_url: dict[str, str] = {}
 
     for _, href, inner_html in anchors:
@@ -38,7 +40,7 @@ def extract_title_links(html_text: str) -> dict[str, str]:
             continue
         if href.startswith("/"):
             full_url = f"{BASE_URL}{href}"
-        elif href.startswith("http://") or href.startswith("https://"):
+        elif href.startswith(HTTP_PREFIXES):
             full_url = href
         else:
             continue
@@ -46,14 +48,16 @@ def extract_title_links(html_text: str) -> dict[str, str]:
         if "newindianexpress.com" not in full_url:
             continue
 
-        text = html.unescape(re.sub(r"<[^>]+>", " ", inner_html))
-        text = re.sub(r"\s+", " ", text).strip()
+        text = html.unescape(TAG_RE.sub(" ", inner_html))
+        text = WS_RE.sub(" ", text).strip()
         if len(text) < 12:
             continue
 
         norm = normalize_title(text)
         if not norm:
             continue
+        if needed is not None and norm not in needed:
+            continue
 
         if norm not in title_to_url:
             title_to_url[norm] = full_url
@@ -74,47 +78,55 @@ def main() -> int:
     html_path = Path(args.html_path)
     db_path = Path(args.db_path)
 
-    html_text = html_path.read_text(encoding="utf-8", errors="ignore")
-    title_links = extract_title_links(html_text)
-
     conn = sqlite3.connect(db_path)
     conn.row_factory = sqlite3.Row
+    conn.executescript(
+        """
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
+    )
     cur = conn.cursor()
 
-    updated = 0
-    unresolved = 0
-
+    # Only rows still holding a placeholder URL need a title match.
     rows = cur.execute(
         """
-        SELECT id, title, canonical_url
+        SELECT id, title
         FROM articles
+        WHERE canonical_url NOT GLOB 'http://*'
+          AND canonical_url NOT GLOB 'https://*'
         ORDER BY published_at DESC
         """
     ).fetchall()
+    title_by_id = {row["id"]: normalize_title(row["title"]) for row in rows}
 
-    for row in rows:
-        article_id = row["id"]
-        title = row["title"]
-        current_url = row["canonical_url"]
+    html_text = html_path.read_text(encoding="utf-8", errors="ignore")
+    title_links = extract_title_links(html_text, needed=set(title_by_id.values()))
 
-        if current_url.startswith("http://") or current_url.startswith("https://"):
-            continue
+    updates: list[tuple[str, int]] = []
+    unresolved = 0
 
-        norm_title = normalize_title(title)
-        matched_url = title_links.get(norm_title)
+    for row in rows:
+        article_id = row["id"]
+        matched_url = title_links.get(title_by_id[article_id])
         if not matched_url:
             unresolved += 1
             continue
+        updates.append((matched_url, article_id))
 
-        cur.execute(
-            "UPDATE articles SET canonical_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (matched_url, article_id),
-        )
-        updated += 1
-
+    # One prepared UPDATE for every match, committed as a single transaction.
+    cur.execute("BEGIN")
+    cur.executemany(
+        "UPDATE articles SET canonical_url = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+        updates,
+    )
     conn.commit()
+    updated = len(updates)
 
-    print(f"Candidate links in HTML: {len(title_links)}")
+    print(f"Candidate links matching unresolved titles: {len(title_links)}")
     print(f"Articles updated with real URLs: {updated}")
     print(f"Articles still unresolved: {unresolved}")
 
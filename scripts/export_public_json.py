@@ -4,10 +4,23 @@
 from __future__ import annotations
 
 import argparse
+import codecs
 import json
+import re
 import sqlite3
+from collections.abc import Iterable, Iterator
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HTTP_PREFIXES = ("http://", "https://")
+# orjson writes floats below 1e-4 or from 1e16 up as 0.0000x / 1e-5 / 1e16 where json writes 1e-05 / 1e+16.
+ORJSON_EXPONENT_RE = re.compile(rb"e-?\d+,?\n")
 
 METHOD_PRIORITY = {
     "manual": 4,
@@ -17,63 +30,58 @@ METHOD_PRIORITY = {
 }
 
 
+def escape_json_ascii(error: UnicodeEncodeError) -> tuple[str, int]:
+    escaped = []
+    for char in error.object[error.start:error.end]:
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            escaped.append(f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}")
+        else:
+            escaped.append(f"\\u{code:04x}")
+    return "".join(escaped), error.end
+
+
+codecs.register_error("json_ascii", escape_json_ascii)
+
+
+def encode_json(value: dict) -> bytes:
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            encoded = None
+        if encoded is not None and b".0000" not in encoded and ORJSON_EXPONENT_RE.search(encoded) is None:
+            # Article text is often non-ASCII; \u-escape orjson's raw UTF-8 (and DEL) the way ensure_ascii=True does.
+            return encoded.decode("utf-8").encode("ascii", "json_ascii").replace(b"\x7f", b"\\u007f")
+    return json.dumps(value, ensure_ascii=True, indent=2).encode("ascii")
+
+
+def write_payload(out: BinaryIO, metadata: dict, articles: Iterable[dict]) -> None:
+    # Same bytes as dumping {"metadata": ..., "articles": [...]} with indent=2, one article at a time.
+    out.write(b'{\n  "metadata": ')
+    out.write(encode_json(metadata).replace(b"\n", b"\n  "))
+    out.write(b',\n  "articles": [')
+    separator = b"\n    "
+    for article in articles:
+        out.write(separator)
+        out.write(encode_json(article).replace(b"\n", b"\n    "))
+        separator = b",\n    "
+    out.write(b"]\n}\n" if separator == b"\n    " else b"\n  ]\n}\n")
+
+
 def pick_tag(existing: dict, candidate: dict) -> dict:
     existing_score = (METHOD_PRIORITY.get(existing["method"], 0), existing["confidence"])
     candidate_score = (METHOD_PRIORITY.get(candidate["method"], 0), candidate["confidence"])
     return candidate if candidate_score > existing_score else existing
 
 
-def gather_shift_annotations(cur: sqlite3.Cursor) -> dict[int, dict[str, dict]]:
-    annotations: dict[int, dict[str, dict]] = {}
-    rows = cur.execute(
-        """
-        SELECT
-            sa.article_id,
-            sa.shift_id,
-            sa.phase,
-            sa.connection_text,
-            sa.key_message,
-            sa.annotation_method,
-            sa.annotation_version,
-            sa.input_fingerprint,
-            sa.run_uid,
-            sa.generated_at,
-            sa.provenance_note
-        FROM shift_annotations sa
-        JOIN (
-            SELECT article_id, shift_id, MAX(id) AS max_id
-            FROM shift_annotations
-            GROUP BY article_id, shift_id
-        ) latest ON latest.max_id = sa.id
-        ORDER BY sa.article_id ASC, sa.shift_id ASC
-        """
-    ).fetchall()
-
-    for row in rows:
-        article_id = int(row["article_id"])
-        shift_id = str(row["shift_id"])
-        article_bucket = annotations.setdefault(article_id, {})
-        article_bucket[shift_id] = {
-            "phase": row["phase"],
-            "connection": row["connection_text"],
-            "key_message": row["key_message"],
-            "audit": {
-                "method": row["annotation_method"],
-                "version": row["annotation_version"],
-                "input_fingerprint": row["input_fingerprint"],
-                "run_uid": row["run_uid"],
-                "generated_at": row["generated_at"],
-                "provenance_note": row["provenance_note"],
-            },
-        }
-
-    return annotations
-
-
-def gather_articles(conn: sqlite3.Connection) -> list[dict]:
+def iter_articles(conn: sqlite3.Connection) -> Iterator[dict]:
     conn.row_factory = sqlite3.Row
     cur = conn.cursor()
 
+    # Tags and latest-per-shift annotations are aggregated to JSON inside SQLite, one row per article.
+    # json_object() prints a REAL with 15 digits, so confidence goes through printf('%!.17g') to round-trip exactly.
     article_rows = cur.execute(
         """
         SELECT
@@ -90,131 +98,212 @@ def gather_articles(conn: sqlite3.Connection) -> list[dict]:
             a.tone,
             a.summary_method,
             a.retrieval_method,
-            a.status
+            a.status,
+            (
+                SELECT json_group_array(
+                    json_object(
+                        'label', t.name,
+                        'slug', t.slug,
+                        'domain', t.domain,
+                        'method', at.method,
+                        'confidence', printf('%!.17g', at.confidence)
+                    )
+                )
+                FROM article_tags at
+                JOIN tags t ON t.id = at.tag_id
+                WHERE at.article_id = a.id
+            ) AS tags_json,
+            (
+                SELECT json_group_object(
+                    latest.shift_id,
+                    json_object(
+                        'phase', latest.phase,
+                        'connection', latest.connection_text,
+                        'key_message', latest.key_message,
+                        'audit', json_object(
+                            'method', latest.annotation_method,
+                            'version', latest.annotation_version,
+                            'input_fingerprint', latest.input_fingerprint,
+                            'run_uid', latest.run_uid,
+                            'generated_at', latest.generated_at,
+                            'provenance_note', latest.provenance_note
+                        )
+                    )
+                )
+                FROM (
+                    SELECT sa.*
+                    FROM shift_annotations sa
+                    WHERE sa.article_id = a.id
+                      AND sa.id = (
+                          SELECT MAX(x.id)
+                          FROM shift_annotations x
+                          WHERE x.article_id = sa.article_id AND x.shift_id = sa.shift_id
+                      )
+                    ORDER BY sa.shift_id ASC
+                ) latest
+            ) AS annotations_json
         FROM articles a
         JOIN publications p ON p.id = a.publication_id
         ORDER BY a.published_at DESC, a.id DESC
         """
-    ).fetchall()
-
-    tags_by_article: dict[int, dict[str, dict]] = {}
-    tag_rows = cur.execute(
-        """
-        SELECT
-            at.article_id,
-            t.name,
-            t.slug,
-            t.domain,
-            at.method,
-            at.confidence
-        FROM article_tags at
-        JOIN tags t ON t.id = at.tag_id
-        ORDER BY at.article_id ASC
-        """
-    ).fetchall()
-    for row in tag_rows:
-        article_id = int(row["article_id"])
-        tag_slug = row["slug"]
-        candidate = {
-            "label": row["name"],
-            "slug": tag_slug,
-            "domain": row["domain"],
-            "method": row["method"],
-            "confidence": float(row["confidence"]),
-        }
-        article_tags = tags_by_article.setdefault(article_id, {})
-        if tag_slug in article_tags:
-            article_tags[tag_slug] = pick_tag(article_tags[tag_slug], candidate)
-        else:
-            article_tags[tag_slug] = candidate
-
-    annotations_by_article = gather_shift_annotations(cur)
+    )
 
-    output: list[dict] = []
     for row in article_rows:
         article_id = int(row["id"])
+        article_tags: dict[str, dict] = {}
+        for candidate in json.loads(row["tags_json"]):
+            candidate["confidence"] = float(candidate["confidence"])
+            tag_slug = candidate["slug"]
+            if tag_slug in article_tags:
+                article_tags[tag_slug] = pick_tag(article_tags[tag_slug], candidate)
+            else:
+                article_tags[tag_slug] = candidate
         tags = sorted(
-            tags_by_article.get(article_id, {}).values(),
+            article_tags.values(),
             key=lambda item: (item["domain"], item["label"].lower()),
         )
         url = row["canonical_url"] or ""
-        output.append(
-            {
-                "id": article_id,
-                "external_id": row["external_id"],
-                "title": row["title"],
-                "date_iso": row["published_at"],
-                "year": int(row["year"]),
-                "url": url if url.startswith("http://") or url.startswith("https://") else None,
-                "has_source_url": bool(url.startswith("http://") or url.startswith("https://")),
-                "publication": row["publication_name"],
-                "section": row["section"],
-                "reading_minutes": row["reading_minutes"],
-                "summary": row["summary"],
-                "tone": row["tone"],
-                "status": row["status"],
-                "summary_method": row["summary_method"],
-                "retrieval_method": row["retrieval_method"],
-                "tags": tags,
-                "shift_annotations": annotations_by_article.get(article_id, {}),
-            }
-        )
-    return output
+        has_source_url = url.startswith(HTTP_PREFIXES)
+        yield {
+            "id": article_id,
+            "external_id": row["external_id"],
+            "title": row["title"],
+            "date_iso": row["published_at"],
+            "year": row["year"],
+            "url": url if has_source_url else None,
+            "has_source_url": has_source_url,
+            "publication": row["publication_name"],
+            "section": row["section"],
+            "reading_minutes": row["reading_minutes"],
+            "summary": row["summary"],
+            "tone": row["tone"],
+            "status": row["status"],
+            "summary_method": row["summary_method"],
+            "retrieval_method": row["retrieval_method"],
+            "tags": tags,
+            "shift_annotations": json.loads(row["annotations_json"]),
+        }
 
 
-def build_metadata(articles: list[dict]) -> dict:
-    years = sorted({a["year"] for a in articles}, reverse=True)
-    tones = sorted({a["tone"] for a in articles if a.get("tone")})
-    sections = sorted({a["section"] for a in articles if a.get("section")})
-    publication_counter: dict[str, int] = {}
-    for article in articles:
-        publication = str(article.get("publication") or "").strip()
-        if not publication:
-            continue
-        publication_counter[publication] = publication_counter.get(publication, 0) + 1
-    publications = sorted(
-        (
-            {"name": name, "count": count}
-            for name, count in publication_counter.items()
-        ),
-        key=lambda item: (-item["count"], item["name"].lower()),
-    )
-    verified = sum(1 for a in articles if a.get("status") == "verified")
-    with_urls = sum(1 for a in articles if a.get("has_source_url"))
+def gather_metadata(conn: sqlite3.Connection) -> dict:
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+
+    # Aggregates come straight from SQLite; they cover exactly the rows iter_articles exports.
+    totals = cur.execute(
+        """
+        SELECT
+            COUNT(*) AS article_count,
+            COALESCE(SUM(a.status = 'verified'), 0) AS verified,
+            COALESCE(
+                SUM(a.canonical_url GLOB 'http://*' OR a.canonical_url GLOB 'https://*'), 0
+            ) AS with_urls
+        FROM articles a
+        JOIN publications p ON p.id = a.publication_id
+        """
+    ).fetchone()
+    article_count = int(totals["article_count"])
+    verified = int(totals["verified"])
+    with_urls = int(totals["with_urls"])
+
+    years = [
+        int(row[0])
+        for row in cur.execute(
+            """
+            SELECT DISTINCT CAST(strftime('%Y', a.published_at) AS INTEGER)
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            ORDER BY 1 DESC
+            """
+        )
+    ]
+    tones = [
+        row[0]
+        for row in cur.execute(
+            """
+            SELECT DISTINCT a.tone
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            WHERE a.tone IS NOT NULL AND a.tone <> ''
+            ORDER BY 1
+            """
+        )
+    ]
+    sections = [
+        row[0]
+        for row in cur.execute(
+            """
+            SELECT DISTINCT a.section
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            WHERE a.section IS NOT NULL AND a.section <> ''
+            ORDER BY 1
+            """
+        )
+    ]
+    publications = [
+        {"name": row["name"], "count": int(row["count"])}
+        for row in cur.execute(
+            """
+            SELECT TRIM(p.name) AS name, COUNT(*) AS count
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            WHERE TRIM(p.name) <> ''
+            GROUP BY TRIM(p.name)
+            ORDER BY count DESC, LOWER(TRIM(p.name)) ASC
+            """
+        )
+    ]
     publication_count = len(publications)
     dataset_label = (
         f"Multi-publication archive v1.0 "
         f"({verified} verified articles across {publication_count} sources)"
     )
-    total_shift_annotations = sum(len(a.get("shift_annotations") or {}) for a in articles)
-    republic_annotations = sum(
-        1 for a in articles if "republic_shift" in (a.get("shift_annotations") or {})
-    )
 
-    tag_counts: dict[str, dict] = {}
-    for article in articles:
-        seen = set()
-        for tag in article["tags"]:
-            slug = tag["slug"]
-            if slug in seen:
-                continue
-            seen.add(slug)
-            if slug not in tag_counts:
-                tag_counts[slug] = {
-                    "label": tag["label"],
-                    "slug": slug,
-                    "domain": tag["domain"],
-                    "count": 0,
-                }
-            tag_counts[slug]["count"] += 1
-
-    top_tags = sorted(tag_counts.values(), key=lambda item: (-item["count"], item["label"].lower()))
+    # One latest annotation is exported per (article, shift), so distinct pairs give the totals.
+    shift_totals = cur.execute(
+        """
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(latest.shift_id = 'republic_shift'), 0) AS republic
+        FROM (
+            SELECT DISTINCT sa.article_id, sa.shift_id
+            FROM shift_annotations sa
+            JOIN articles a ON a.id = sa.article_id
+            JOIN publications p ON p.id = a.publication_id
+        ) latest
+        """
+    ).fetchone()
+    total_shift_annotations = int(shift_totals["total"])
+    republic_annotations = int(shift_totals["republic"])
+
+    top_tags = sorted(
+        (
+            {
+                "label": row["name"],
+                "slug": row["slug"],
+                "domain": row["domain"],
+                "count": int(row["count"]),
+            }
+            for row in cur.execute(
+                """
+                SELECT t.name, t.slug, t.domain, COUNT(DISTINCT at.article_id) AS count
+                FROM article_tags at
+                JOIN tags t ON t.id = at.tag_id
+                JOIN articles a ON a.id = at.article_id
+                JOIN publications p ON p.id = a.publication_id
+                GROUP BY t.slug
+                """
+            )
+        ),
+        key=lambda item: (-item["count"], item["label"].lower()),
+    )
 
     return {
         "project": "Shiv Visvanathan Opinion Archive",
         "dataset": dataset_label,
         "generated_at_utc": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
-        "article_count": len(articles),
+        "article_count": article_count,
         "verified_count": verified,
         "source_url_count": with_urls,
         "shift_annotation_count": total_shift_annotations,
@@ -247,17 +336,27 @@ def main() -> int:
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
     conn = sqlite3.connect(db_path)
-    articles = gather_articles(conn)
-    metadata = build_metadata(articles)
-    conn.close()
-
-    payload = {"metadata": metadata, "articles": articles}
-    output_path.write_text(
-        json.dumps(payload, ensure_ascii=True, indent=2) + "\n",
-        encoding="utf-8",
+    conn.executescript(
+        """
+        PRAGMA journal_mode = WAL;
+        PRAGMA synchronous = NORMAL;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
     )
+    # Metadata is aggregated in SQL ahead of the single article pass; one snapshot keeps the counts
+    # in step with the rows written.
+    conn.execute("BEGIN")
+    metadata = gather_metadata(conn)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    with tmp_path.open("wb") as out:
+        write_payload(out, metadata, iter_articles(conn))
+    conn.commit()
+    conn.close()
+    tmp_path.replace(output_path)
 
-    print(f"Exported {len(articles)} records to {output_path}")
+    print(f"Exported {metadata['article_count']} records to {output_path}")
     print(f"Verified records: {metadata['verified_count']}")
     print(f"Records with source URL: {metadata['source_url_count']}")
     return 0
@@ -4,10 +4,26 @@
 from __future__ import annotations
 
 import argparse
+import codecs
+import gzip
 import json
+import re
 import sqlite3
+import sys
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import UTC, datetime
 from pathlib import Path
+from typing import BinaryIO
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+HTTP_PREFIXES = ("http://", "https://")
+# Exponent-form float ending a value, indented or compact; orjson and json disagree on these (1e-5 vs 1e-05, 1e16 vs 1e+16).
+ORJSON_EXPONENT_RE = re.compile(rb"e-?\d+[,\n}\]]")
 
 METHOD_PRIORITY = {
     "manual": 4,
@@ -16,12 +32,113 @@ METHOD_PRIORITY = {
     "keyword": 1,
 }
 
+EVIDENCE_COLUMNS = (
+    "phase",
+    "include_in_story",
+    "relevance_score",
+    "strength_label",
+    "connection_text",
+    "rationale",
+    "quote_text",
+    "quote_source",
+    "quote_confidence",
+    "method",
+    "version",
+    "input_fingerprint",
+    "run_uid",
+    "generated_at",
+)
+
+# Column positions in the article query; that cursor returns plain tuples.
+(
+    ID,
+    UID,
+    EXTERNAL_ID,
+    TITLE,
+    PUBLISHED_AT,
+    YEAR,
+    URL,
+    PUBLICATION,
+    SECTION,
+    READING_MINUTES,
+    STATUS,
+    RETRIEVAL_METHOD,
+    TEXT_STATE,
+    HAS_FULL_TEXT,
+    HAS_ANALYSIS,
+    SUMMARY,
+    TONE,
+    SUMMARY_METHOD,
+    EVIDENCE,
+) = range(19)
+
+
+def escape_json_ascii(error: UnicodeEncodeError) -> tuple[str, int]:
+    escaped = []
+    for char in error.object[error.start:error.end]:
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            escaped.append(f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}")
+        else:
+            escaped.append(f"\\u{code:04x}")
+    return "".join(escaped), error.end
+
+
+codecs.register_error("json_ascii", escape_json_ascii)
+
+
+def encode_json(value: dict, compact: bool = False) -> bytes:
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value) if compact else orjson.dumps(value, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            encoded = None
+        # Scores under 1e-4 come out as 0.0000x from orjson; those payloads, like exponent floats, go through json.
+        if encoded is not None and b".0000" not in encoded and ORJSON_EXPONENT_RE.search(encoded) is None:
+            # Both layouts must match ensure_ascii=True, so escape raw UTF-8 and DEL in place.
+            return encoded.decode("utf-8").encode("ascii", "json_ascii").replace(b"\x7f", b"\\u007f")
+    if compact:
+        return json.dumps(value, ensure_ascii=True, separators=(",", ":")).encode("ascii")
+    return json.dumps(value, ensure_ascii=True, indent=2).encode("ascii")
+
+
+def tee_compact_payload(out: BinaryIO, metadata: dict, articles: Iterable[dict]) -> Iterator[dict]:
+    # Writes the minified copy while passing each article on, so both layouts come from one article pass.
+    out.write(b'{"metadata":')
+    out.write(encode_json(metadata, compact=True))
+    out.write(b',"articles":[')
+    separator = b""
+    for article in articles:
+        out.write(separator)
+        out.write(encode_json(article, compact=True))
+        separator = b","
+        yield article
+    out.write(b"]}\n")
+
+
+def write_payload(out: BinaryIO, metadata: dict, articles: Iterable[dict]) -> None:
+    # Same bytes as dumping {"metadata": ..., "articles": [...]} with indent=2, one article at a time.
+    out.write(b'{\n  "metadata": ')
+    out.write(encode_json(metadata).replace(b"\n", b"\n  "))
+    out.write(b',\n  "articles": [')
+    separator = b"\n    "
+    for article in articles:
+        out.write(separator)
+        out.write(encode_json(article).replace(b"\n", b"\n    "))
+        separator = b",\n    "
+    out.write(b"]\n}\n" if separator == b"\n    " else b"\n  ]\n}\n")
+
 
-def table_exists(cur: sqlite3.Cursor, table_name: str) -> bool:
+def intern_text(value: str | None) -> str | None:
+    return sys.intern(value) if value is not None else None
+
+
+def table_exists(cur: sqlite3.Cursor, table_name: str, schema: str = "main") -> bool:
     row = cur.execute(
-        """
+        f"""
         SELECT 1
-        FROM sqlite_master
+        FROM {schema}.sqlite_master
         WHERE type = 'table' AND name = ?
         LIMIT 1
         """,
@@ -30,12 +147,6 @@ def table_exists(cur: sqlite3.Cursor, table_name: str) -> bool:
     return row is not None
 
 
-def pick_tag(existing: dict, candidate: dict) -> dict:
-    existing_score = (METHOD_PRIORITY.get(existing["method"], 0), existing["confidence"])
-    candidate_score = (METHOD_PRIORITY.get(candidate["method"], 0), candidate["confidence"])
-    return candidate if candidate_score > existing_score else existing
-
-
 def gather_shift_annotations(cur: sqlite3.Cursor) -> dict[str, dict[str, dict]]:
     annotations: dict[str, dict[str, dict]] = {}
     rows = cur.execute(
@@ -52,149 +163,168 @@ def gather_shift_annotations(cur: sqlite3.Cursor) -> dict[str, dict[str, dict]]:
             sa.run_uid,
             sa.generated_at,
             sa.provenance_note
-        FROM shift_annotations sa
-        JOIN (
-            SELECT article_uid, shift_id, MAX(id) AS max_id
-            FROM shift_annotations
-            GROUP BY article_uid, shift_id
-        ) latest ON latest.max_id = sa.id
+        FROM (
+            SELECT
+                *,
+                ROW_NUMBER() OVER (PARTITION BY article_uid, shift_id ORDER BY id DESC) AS rn
+            FROM ana.shift_annotations
+        ) sa
+        WHERE sa.rn = 1
         ORDER BY sa.article_uid ASC, sa.shift_id ASC
         """
-    ).fetchall()
+    )
 
+    # Every annotation stays in memory for the whole export. Phases, connection templates and
+    # run metadata repeat across articles, so those strings are interned and shared.
     for row in rows:
         article_uid = str(row["article_uid"])
-        shift_id = str(row["shift_id"])
+        shift_id = sys.intern(str(row["shift_id"]))
         article_bucket = annotations.setdefault(article_uid, {})
         article_bucket[shift_id] = {
-            "phase": row["phase"],
-            "connection": row["connection_text"],
+            "phase": intern_text(row["phase"]),
+            "connection": intern_text(row["connection_text"]),
             "key_message": row["key_message"],
             "audit": {
-                "method": row["annotation_method"],
-                "version": row["annotation_version"],
+                "method": intern_text(row["annotation_method"]),
+                "version": intern_text(row["annotation_version"]),
                 "input_fingerprint": row["input_fingerprint"],
-                "run_uid": row["run_uid"],
-                "generated_at": row["generated_at"],
-                "provenance_note": row["provenance_note"],
+                "run_uid": intern_text(row["run_uid"]),
+                "generated_at": intern_text(row["generated_at"]),
+                "provenance_note": intern_text(row["provenance_note"]),
             },
         }
 
     return annotations
 
 
-def gather_republic_evidence(cur: sqlite3.Cursor) -> dict[str, dict]:
-    if not table_exists(cur, "republic_shift_evidence"):
-        return {}
-    rows = cur.execute(
-        """
-        SELECT
-            e.article_uid,
-            e.phase,
-            e.include_in_story,
-            e.relevance_score,
-            e.strength_label,
-            e.connection_text,
-            e.rationale,
-            e.quote_text,
-            e.quote_source,
-            e.quote_confidence,
-            e.method,
-            e.version,
-            e.input_fingerprint,
-            e.run_uid,
-            e.generated_at
-        FROM republic_shift_evidence e
-        JOIN (
-            SELECT article_uid, MAX(id) AS max_id
-            FROM republic_shift_evidence
-            GROUP BY article_uid
-        ) latest
-            ON latest.max_id = e.id
-        ORDER BY e.article_uid ASC
-        """
-    ).fetchall()
-
-    out: dict[str, dict] = {}
-    for row in rows:
-        out[str(row["article_uid"])] = {
-            "phase": row["phase"],
-            "include_in_story": bool(row["include_in_story"]),
-            "relevance_score": float(row["relevance_score"]),
-            "strength_label": row["strength_label"],
-            "connection_text": row["connection_text"],
-            "rationale": row["rationale"],
-            "quote_text": row["quote_text"],
-            "quote_source": row["quote_source"],
-            "quote_confidence": float(row["quote_confidence"]),
-            "audit": {
-                "method": row["method"],
-                "version": row["version"],
-                "input_fingerprint": row["input_fingerprint"],
-                "run_uid": row["run_uid"],
-                "generated_at": row["generated_at"],
-            },
-        }
-    return out
-
-
-def gather_analysis(cur: sqlite3.Cursor) -> tuple[dict[str, sqlite3.Row], dict[str, dict], dict[str, dict[str, dict]]]:
-    analysis_rows = cur.execute(
-        """
-        SELECT
-            article_uid,
-            summary,
-            tone,
-            summary_method,
-            analysis_status
-        FROM article_analysis
-        """
-    ).fetchall()
-    analysis_by_uid = {str(row["article_uid"]): row for row in analysis_rows}
-
-    tags_by_article: dict[str, dict[str, dict]] = {}
+def gather_tags(cur: sqlite3.Cursor) -> dict[str, list[dict]]:
+    # When a tag was assigned by several methods, keep the highest (method priority, confidence).
+    # Rows arrive already in output order per article: domain, then case-folded label.
+    method_priority = " ".join(
+        f"WHEN '{method}' THEN {priority}" for method, priority in METHOD_PRIORITY.items()
+    )
+    tags_by_article: dict[str, list[dict]] = {}
     tag_rows = cur.execute(
+        f"""
+        SELECT article_uid, name, slug, domain, method, confidence
+        FROM (
+            SELECT
+                at.article_uid,
+                t.name,
+                t.slug,
+                t.domain,
+                at.method,
+                at.confidence,
+                ROW_NUMBER() OVER (
+                    PARTITION BY at.article_uid, t.slug
+                    ORDER BY CASE at.method {method_priority} ELSE 0 END DESC, at.confidence DESC
+                ) AS rn
+            FROM ana.article_tags at
+            JOIN ana.tags t ON t.id = at.tag_id
+        )
+        WHERE rn = 1
+        ORDER BY article_uid ASC, domain ASC, LOWER(name) ASC
         """
-        SELECT
-            at.article_uid,
-            t.name,
-            t.slug,
-            t.domain,
-            at.method,
-            at.confidence
-        FROM article_tags at
-        JOIN tags t ON t.id = at.tag_id
-        ORDER BY at.article_uid ASC
-        """
-    ).fetchall()
+    )
     for row in tag_rows:
-        article_uid = str(row["article_uid"])
-        tag_slug = row["slug"]
-        candidate = {
-            "label": row["name"],
-            "slug": tag_slug,
-            "domain": row["domain"],
-            "method": row["method"],
-            "confidence": float(row["confidence"]),
-        }
-        article_tags = tags_by_article.setdefault(article_uid, {})
-        if tag_slug in article_tags:
-            article_tags[tag_slug] = pick_tag(article_tags[tag_slug], candidate)
-        else:
-            article_tags[tag_slug] = candidate
-
-    annotations_by_article = gather_shift_annotations(cur)
-    return analysis_by_uid, tags_by_article, annotations_by_article
-
+        tags_by_article.setdefault(str(row["article_uid"]), []).append(
+            {
+                "label": intern_text(row["name"]),
+                "slug": intern_text(row["slug"]),
+                "domain": intern_text(row["domain"]),
+                "method": intern_text(row["method"]),
+                "confidence": float(row["confidence"]),
+            }
+        )
+    return tags_by_article
+
+
+def gather_from_analysis(gather: Callable[[sqlite3.Cursor], dict], analysis_uri: str) -> dict:
+    # Runs on a worker thread, so it needs its own connection; attaching as `ana` keeps the SQL shared.
+    conn = sqlite3.connect("file::memory:", uri=True)
+    try:
+        conn.row_factory = sqlite3.Row
+        conn.execute("ATTACH DATABASE ? AS ana", (analysis_uri,))
+        return gather(conn.cursor())
+    finally:
+        conn.close()
+
+
+def republic_evidence(row: tuple) -> dict | None:
+    (
+        phase,
+        include_in_story,
+        relevance_score,
+        strength_label,
+        connection_text,
+        rationale,
+        quote_text,
+        quote_source,
+        quote_confidence,
+        method,
+        version,
+        input_fingerprint,
+        run_uid,
+        generated_at,
+    ) = row[EVIDENCE:]
+    if run_uid is None:
+        return None
+    return {
+        "phase": phase,
+        "include_in_story": bool(include_in_story),
+        "relevance_score": float(relevance_score),
+        "strength_label": strength_label,
+        "connection_text": connection_text,
+        "rationale": rationale,
+        "quote_text": quote_text,
+        "quote_source": quote_source,
+        "quote_confidence": float(quote_confidence),
+        "audit": {
+            "method": method,
+            "version": version,
+            "input_fingerprint": input_fingerprint,
+            "run_uid": run_uid,
+            "generated_at": generated_at,
+        },
+    }
 
-def gather_articles(master_conn: sqlite3.Connection, analysis_conn: sqlite3.Connection) -> list[dict]:
-    master_conn.row_factory = sqlite3.Row
-    analysis_conn.row_factory = sqlite3.Row
-    master_cur = master_conn.cursor()
-    analysis_cur = analysis_conn.cursor()
 
-    master_rows = master_cur.execute(
+def iter_articles(conn: sqlite3.Connection, analysis_uri: str) -> Iterator[dict]:
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+
+    # Tags and annotations load from the analysis DB on worker threads while the article query runs.
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        tags_future = executor.submit(gather_from_analysis, gather_tags, analysis_uri)
+        annotations_future = executor.submit(gather_from_analysis, gather_shift_annotations, analysis_uri)
+        yield from assemble_articles(cur, tags_future.result, annotations_future.result)
+
+
+def assemble_articles(
+    cur: sqlite3.Cursor,
+    tags_result: Callable[[], dict[str, list[dict]]],
+    annotations_result: Callable[[], dict[str, dict[str, dict]]],
+) -> Iterator[dict]:
+    # Latest republic evidence joins straight onto the article row when the analysis DB has it.
+    if table_exists(cur, "republic_shift_evidence", schema="ana"):
+        evidence_columns = ",\n".join(f"e.{column} AS evidence_{column}" for column in EVIDENCE_COLUMNS)
+        evidence_join = """
+        LEFT JOIN ana.republic_shift_evidence e
+            ON e.id = (
+                SELECT x.id
+                FROM ana.republic_shift_evidence x
+                WHERE x.article_uid = a.article_uid
+                ORDER BY x.id DESC
+                LIMIT 1
+            )
         """
+    else:
+        evidence_columns = ",\n".join(f"NULL AS evidence_{column}" for column in EVIDENCE_COLUMNS)
+        evidence_join = ""
+
+    cur.row_factory = None
+    master_rows = cur.execute(
+        f"""
         SELECT
             a.id,
             a.article_uid,
@@ -212,116 +342,201 @@ def gather_articles(master_conn: sqlite3.Connection, analysis_conn: sqlite3.Conn
             CASE
                 WHEN t.body_text IS NOT NULL AND TRIM(t.body_text) <> '' THEN 1
                 ELSE 0
-            END AS has_full_text
+            END AS has_full_text,
+            aa.article_uid IS NOT NULL AS has_analysis,
+            aa.summary,
+            aa.tone,
+            aa.summary_method,
+            {evidence_columns}
         FROM articles a
         JOIN publications p ON p.id = a.publication_id
         LEFT JOIN article_texts t
             ON t.article_uid = a.article_uid
            AND t.is_primary = 1
+        LEFT JOIN ana.article_analysis aa ON aa.article_uid = a.article_uid
+        {evidence_join}
         ORDER BY a.published_at DESC, a.id DESC
         """
-    ).fetchall()
+    )
 
-    analysis_by_uid, tags_by_article, annotations_by_article = gather_analysis(analysis_cur)
-    republic_evidence_by_article = gather_republic_evidence(analysis_cur)
+    get_tags = tags_result().get
+    get_annotations = annotations_result().get
 
-    output: list[dict] = []
     for row in master_rows:
-        article_uid = str(row["article_uid"])
-        analysis = analysis_by_uid.get(article_uid)
-        summary = analysis["summary"] if analysis else None
-        tone = analysis["tone"] if analysis else None
-        summary_method = analysis["summary_method"] if analysis else "manual"
-        url = row["canonical_url"] or ""
-        output.append(
-            {
-                "id": int(row["id"]),
-                "article_uid": article_uid,
-                "external_id": row["external_id"],
-                "title": row["title"],
-                "date_iso": row["published_at"],
-                "year": int(row["year"]),
-                "url": url if url.startswith("http://") or url.startswith("https://") else None,
-                "has_source_url": bool(url.startswith("http://") or url.startswith("https://")),
-                "publication": row["publication_name"],
-                "section": row["section"],
-                "reading_minutes": row["reading_minutes"],
-                "summary": summary,
-                "tone": tone,
-                "status": row["status"],
-                "summary_method": summary_method,
-                "retrieval_method": row["retrieval_method"],
-                "text_state": row["text_state"],
-                "has_full_text": bool(row["has_full_text"]),
-                "tags": sorted(
-                    tags_by_article.get(article_uid, {}).values(),
-                    key=lambda item: (item["domain"], item["label"].lower()),
-                ),
-                "shift_annotations": annotations_by_article.get(article_uid, {}),
-                "republic_critical": republic_evidence_by_article.get(article_uid),
-            }
-        )
-    return output
+        article_uid = str(row[UID])
+        url = row[URL] or ""
+        has_source_url = url.startswith(HTTP_PREFIXES)
+        yield {
+            "id": int(row[ID]),
+            "article_uid": article_uid,
+            "external_id": row[EXTERNAL_ID],
+            "title": row[TITLE],
+            "date_iso": row[PUBLISHED_AT],
+            "year": row[YEAR],
+            "url": url if has_source_url else None,
+            "has_source_url": has_source_url,
+            "publication": row[PUBLICATION],
+            "section": row[SECTION],
+            "reading_minutes": row[READING_MINUTES],
+            "summary": row[SUMMARY],
+            "tone": row[TONE],
+            "status": row[STATUS],
+            "summary_method": row[SUMMARY_METHOD] if row[HAS_ANALYSIS] else "manual",
+            "retrieval_method": row[RETRIEVAL_METHOD],
+            "text_state": row[TEXT_STATE],
+            "has_full_text": bool(row[HAS_FULL_TEXT]),
+            "tags": get_tags(article_uid, []),
+            "shift_annotations": get_annotations(article_uid, {}),
+            "republic_critical": republic_evidence(row),
+        }
 
 
-def build_metadata(articles: list[dict]) -> dict:
-    years = sorted({a["year"] for a in articles}, reverse=True)
-    tones = sorted({a["tone"] for a in articles if a.get("tone")})
-    sections = sorted({a["section"] for a in articles if a.get("section")})
-    publication_counter: dict[str, int] = {}
-    for article in articles:
-        publication = str(article.get("publication") or "").strip()
-        if not publication:
-            continue
-        publication_counter[publication] = publication_counter.get(publication, 0) + 1
-    publications = sorted(
-        (
-            {"name": name, "count": count}
-            for name, count in publication_counter.items()
-        ),
-        key=lambda item: (-item["count"], item["name"].lower()),
-    )
-    verified = sum(1 for a in articles if a.get("status") == "verified")
-    with_urls = sum(1 for a in articles if a.get("has_source_url"))
-    with_full_text = sum(1 for a in articles if a.get("has_full_text"))
+def gather_metadata(conn: sqlite3.Connection) -> dict:
+    conn.row_factory = sqlite3.Row
+    cur = conn.cursor()
+
+    # Aggregates come straight from SQLite; they cover exactly the rows iter_articles exports.
+    totals = cur.execute(
+        """
+        SELECT
+            COUNT(*) AS article_count,
+            COALESCE(SUM(a.status = 'verified'), 0) AS verified,
+            COALESCE(
+                SUM(a.canonical_url GLOB 'http://*' OR a.canonical_url GLOB 'https://*'), 0
+            ) AS with_urls,
+            COALESCE(SUM(t.body_text IS NOT NULL AND TRIM(t.body_text) <> ''), 0) AS with_full_text
+        FROM articles a
+        JOIN publications p ON p.id = a.publication_id
+        LEFT JOIN article_texts t
+            ON t.article_uid = a.article_uid
+           AND t.is_primary = 1
+        """
+    ).fetchone()
+    article_count = int(totals["article_count"])
+    verified = int(totals["verified"])
+    with_urls = int(totals["with_urls"])
+    with_full_text = int(totals["with_full_text"])
+
+    years = [
+        int(row[0])
+        for row in cur.execute(
+            """
+            SELECT DISTINCT CAST(strftime('%Y', a.published_at) AS INTEGER)
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            ORDER BY 1 DESC
+            """
+        )
+    ]
+    tones = [
+        row[0]
+        for row in cur.execute(
+            """
+            SELECT DISTINCT aa.tone
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            JOIN ana.article_analysis aa ON aa.article_uid = a.article_uid
+            WHERE aa.tone IS NOT NULL AND aa.tone <> ''
+            ORDER BY 1
+            """
+        )
+    ]
+    sections = [
+        row[0]
+        for row in cur.execute(
+            """
+            SELECT DISTINCT a.section
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            WHERE a.section IS NOT NULL AND a.section <> ''
+            ORDER BY 1
+            """
+        )
+    ]
+    publications = [
+        {"name": row["name"], "count": int(row["count"])}
+        for row in cur.execute(
+            """
+            SELECT TRIM(p.name) AS name, COUNT(*) AS count
+            FROM articles a
+            JOIN publications p ON p.id = a.publication_id
+            WHERE TRIM(p.name) <> ''
+            GROUP BY TRIM(p.name)
+            ORDER BY count DESC, LOWER(TRIM(p.name)) ASC
+            """
+        )
+    ]
     publication_count = len(publications)
     dataset_label = (
         f"Multi-publication archive v1.1 "
         f"({verified} verified articles across {publication_count} sources)"
     )
-    total_shift_annotations = sum(len(a.get("shift_annotations") or {}) for a in articles)
-    republic_annotations = sum(
-        1 for a in articles if "republic_shift" in (a.get("shift_annotations") or {})
-    )
-    republic_curated = sum(
-        1 for a in articles if (a.get("republic_critical") or {}).get("include_in_story")
-    )
 
-    tag_counts: dict[str, dict] = {}
-    for article in articles:
-        seen = set()
-        for tag in article["tags"]:
-            slug = tag["slug"]
-            if slug in seen:
-                continue
-            seen.add(slug)
-            if slug not in tag_counts:
-                tag_counts[slug] = {
-                    "label": tag["label"],
-                    "slug": slug,
-                    "domain": tag["domain"],
-                    "count": 0,
-                }
-            tag_counts[slug]["count"] += 1
-
-    top_tags = sorted(tag_counts.values(), key=lambda item: (-item["count"], item["label"].lower()))
+    shift_totals = cur.execute(
+        """
+        SELECT
+            COUNT(*) AS total,
+            COALESCE(SUM(latest.shift_id = 'republic_shift'), 0) AS republic
+        FROM (
+            SELECT DISTINCT sa.article_uid, sa.shift_id
+            FROM ana.shift_annotations sa
+            JOIN articles a ON a.article_uid = sa.article_uid
+            JOIN publications p ON p.id = a.publication_id
+        ) latest
+        """
+    ).fetchone()
+    total_shift_annotations = int(shift_totals["total"])
+    republic_annotations = int(shift_totals["republic"])
+
+    republic_curated = 0
+    if table_exists(cur, "republic_shift_evidence", schema="ana"):
+        republic_curated = int(
+            cur.execute(
+                """
+                SELECT COUNT(*)
+                FROM articles a
+                JOIN publications p ON p.id = a.publication_id
+                JOIN ana.republic_shift_evidence e
+                    ON e.id = (
+                        SELECT x.id
+                        FROM ana.republic_shift_evidence x
+                        WHERE x.article_uid = a.article_uid
+                        ORDER BY x.id DESC
+                        LIMIT 1
+                    )
+                WHERE e.include_in_story
+                """
+            ).fetchone()[0]
+        )
+
+    top_tags = sorted(
+        (
+            {
+                "label": row["name"],
+                "slug": row["slug"],
+                "domain": row["domain"],
+                "count": int(row["count"]),
+            }
+            for row in cur.execute(
+                """
+                SELECT t.name, t.slug, t.domain, COUNT(DISTINCT at.article_uid) AS count
+                FROM ana.article_tags at
+                JOIN ana.tags t ON t.id = at.tag_id
+                JOIN articles a ON a.article_uid = at.article_uid
+                JOIN publications p ON p.id = a.publication_id
+                GROUP BY t.slug
+                """
+            )
+        ),
+        key=lambda item: (-item["count"], item["label"].lower()),
+    )
 
     return {
         "project": "Shiv Visvanathan Opinion Archive",
         "dataset": dataset_label,
         "generated_at_utc": datetime.now(UTC).strftime("%Y-%m-%dT%H:%M:%SZ"),
         "database_mode": "dual_db",
-        "article_count": len(articles),
+        "article_count": article_count,
         "verified_count": verified,
         "source_url_count": with_urls,
         "full_text_count": with_full_text,
@@ -354,6 +569,11 @@ def main() -> int:
         default="/Users/praneet/shiv-archive/web/public/data/articles.json",
         help="Output JSON path.",
     )
+    parser.add_argument(
+        "--compact-output-path",
+        default="",
+        help="Also write a minified copy here (gzip-compressed when the path ends in .gz).",
+    )
     args = parser.parse_args()
 
     master_db_path = Path(args.master_db_path)
@@ -361,23 +581,53 @@ def main() -> int:
     output_path = Path(args.output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    master_conn = sqlite3.connect(master_db_path)
-    analysis_conn = sqlite3.connect(analysis_db_path)
-    articles = gather_articles(master_conn, analysis_conn)
-    metadata = build_metadata(articles)
-    master_conn.close()
-    analysis_conn.close()
-
-    payload = {"metadata": metadata, "articles": articles}
-    output_path.write_text(
-        json.dumps(payload, ensure_ascii=True, indent=2) + "\n",
-        encoding="utf-8",
+    # The analysis DB is attached so articles, analysis and evidence come back from one query.
+    # Both are opened read-only; the export never writes.
+    analysis_uri = f"{analysis_db_path.resolve().as_uri()}?mode=ro"
+    conn = sqlite3.connect(f"{master_db_path.resolve().as_uri()}?mode=ro", uri=True)
+    conn.execute("ATTACH DATABASE ? AS ana", (analysis_uri,))
+    conn.executescript(
+        """
+        PRAGMA query_only = 1;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA main.cache_size = -262144;
+        PRAGMA ana.cache_size = -262144;
+        PRAGMA main.mmap_size = 1073741824;
+        PRAGMA ana.mmap_size = 1073741824;
+        """
     )
 
-    print(f"Exported {len(articles)} records to {output_path}")
+    # Metadata and the article rows read from this connection share one snapshot; the tag and annotation
+    # maps are read separately on worker-thread connections, outside it.
+    conn.execute("BEGIN")
+    metadata = gather_metadata(conn)
+    tmp_path = output_path.with_name(output_path.name + ".tmp")
+    articles = iter_articles(conn, analysis_uri)
+    with tmp_path.open("wb") as out:
+        if args.compact_output_path:
+            compact_path = Path(args.compact_output_path)
+            compact_path.parent.mkdir(parents=True, exist_ok=True)
+            compact_tmp_path = compact_path.with_name(compact_path.name + ".tmp")
+            if compact_path.suffix == ".gz":
+                compact_out = gzip.open(compact_tmp_path, "wb", compresslevel=6)
+            else:
+                compact_out = compact_tmp_path.open("wb")
+            with compact_out:
+                write_payload(out, metadata, tee_compact_payload(compact_out, metadata, articles))
+        else:
+            write_payload(out, metadata, articles)
+    conn.commit()
+    conn.close()
+    tmp_path.replace(output_path)
+    if args.compact_output_path:
+        compact_tmp_path.replace(compact_path)
+
+    print(f"Exported {metadata['article_count']} records to {output_path}")
     print(f"Verified records: {metadata['verified_count']}")
     print(f"Records with source URL: {metadata['source_url_count']}")
     print(f"Records with full text: {metadata['full_text_count']}")
+    if args.compact_output_path:
+        print(f"Compact copy: {args.compact_output_path}")
     return 0
 
 
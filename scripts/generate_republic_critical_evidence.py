@@ -8,13 +8,25 @@ import hashlib
 import re
 import sqlite3
 import uuid
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
 from datetime import UTC, datetime
+from functools import partial
 from pathlib import Path
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 MILESTONE_YEAR = 2024
 DEFAULT_METHOD = "rule_based_critical"
 DEFAULT_VERSION = "critical_v1"
+SCORE_CHUNK_SIZE = 64
+
+WHITESPACE_RE = re.compile(r"\s+")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+SENTENCE_END_RE = re.compile(r"^(.+?[.!?])(\s|$)")
 
 REPUBLIC_ANCHORS = [
     "republic",
@@ -100,7 +112,7 @@ PHASE_KEYWORDS: dict[str, dict[str, list[str]]] = {
 }
 
 TAG_SLUG_SIGNALS = {
-    "before": {
+    "before": frozenset({
         "democracy",
         "law-and-justice",
         "public-institutions",
@@ -108,8 +120,8 @@ TAG_SLUG_SIGNALS = {
         "nationalism",
         "secularism",
         "education-policy",
-    },
-    "after": {
+    }),
+    "after": frozenset({
         "democracy",
         "pluralism",
         "ethics",
@@ -117,35 +129,50 @@ TAG_SLUG_SIGNALS = {
         "ecology",
         "technology-and-society",
         "public-sphere",
-    },
+    }),
+}
+
+
+def build_probe_automaton(probes: list[str]):
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for probe in probes:
+        automaton.add_word(probe, probe)
+    automaton.make_automaton()
+    return automaton
+
+
+ANCHOR_SET = frozenset(REPUBLIC_ANCHORS)
+
+# Each phase automaton also carries the anchors, so one pass finds both kinds of term.
+PHASE_AUTOMATA = {
+    phase: build_probe_automaton([probe for probes in groups.values() for probe in probes] + REPUBLIC_ANCHORS)
+    for phase, groups in PHASE_KEYWORDS.items()
 }
 
 
 def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", (text or "")).strip().lower()
+    return WHITESPACE_RE.sub(" ", (text or "")).strip().lower()
 
 
 def split_paragraphs(body_text: str) -> list[str]:
     if not body_text:
         return []
-    parts = [re.sub(r"\s+", " ", chunk).strip() for chunk in body_text.split("\n\n")]
+    parts = [WHITESPACE_RE.sub(" ", chunk).strip() for chunk in body_text.split("\n\n")]
     return [part for part in parts if len(part) >= 70]
 
 
 def first_sentence(text: str) -> str:
-    normalized = re.sub(r"\s+", " ", (text or "")).strip()
+    normalized = WHITESPACE_RE.sub(" ", (text or "")).strip()
     if not normalized:
         return ""
-    match = re.match(r"^(.+?[.!?])(\s|$)", normalized)
+    match = SENTENCE_END_RE.match(normalized)
     return (match.group(1) if match else normalized).strip()
 
 
 def count_occurrences(text: str, probes: list[str]) -> int:
-    score = 0
-    for probe in probes:
-        if probe in text:
-            score += 1
-    return score
+    return sum(map(text.__contains__, probes))
 
 
 def compute_group_hits(phase: str, text: str) -> dict[str, int]:
@@ -153,20 +180,66 @@ def compute_group_hits(phase: str, text: str) -> dict[str, int]:
     return {group: count_occurrences(text, probes) for group, probes in groups.items()}
 
 
+def group_hits_from(phase: str, found: set[str]) -> dict[str, int]:
+    groups = PHASE_KEYWORDS[phase]
+    return {group: sum(1 for probe in probes if probe in found) for group, probes in groups.items()}
+
+
+def scan_probes(phase: str, text: str) -> tuple[dict[str, int], int]:
+    automaton = PHASE_AUTOMATA[phase]
+    if automaton is None:
+        return compute_group_hits(phase, text), count_occurrences(text, REPUBLIC_ANCHORS)
+    found = {probe for _, probe in automaton.iter(text)}
+    return group_hits_from(phase, found), len(found & ANCHOR_SET)
+
+
+def has_any_probe(phase: str, text: str) -> bool:
+    automaton = PHASE_AUTOMATA[phase]
+    if automaton is None:
+        probes = [probe for group in PHASE_KEYWORDS[phase].values() for probe in group] + REPUBLIC_ANCHORS
+        return any(probe in text for probe in probes)
+    # Stops at the first match instead of collecting them all.
+    return next(automaton.iter(text), None) is not None
+
+
 def score_article(
     phase: str,
-    title: str,
-    summary: str,
+    title_norm: str,
+    summary_norm: str,
     tag_slugs: list[str],
-    body_text: str,
+    body_norm: str,
 ) -> tuple[float, dict[str, int], int, int]:
-    title_norm = normalize(title)
-    summary_norm = normalize(summary)
-    body_norm = normalize(body_text)
-
-    groups_title = compute_group_hits(phase, title_norm)
-    groups_summary = compute_group_hits(phase, summary_norm)
-    groups_body = compute_group_hits(phase, body_norm)
+    combined = " ".join([title_norm, summary_norm, body_norm])
+    automaton = PHASE_AUTOMATA[phase]
+    if automaton is None:
+        groups_title = compute_group_hits(phase, title_norm)
+        groups_summary = compute_group_hits(phase, summary_norm)
+        groups_body = compute_group_hits(phase, body_norm)
+        anchor_hits = count_occurrences(combined, REPUBLIC_ANCHORS)
+    else:
+        # One pass over the joined text; a probe counts for a field only when it lies wholly inside it,
+        # while anchors count anywhere in the joined text as before.
+        summary_start = len(title_norm) + 1
+        body_start = summary_start + len(summary_norm) + 1
+        found_title: set[str] = set()
+        found_summary: set[str] = set()
+        found_body: set[str] = set()
+        anchors: set[str] = set()
+        for end, probe in automaton.iter(combined):
+            if probe in ANCHOR_SET:
+                anchors.add(probe)
+            start = end - len(probe) + 1
+            if start >= body_start:
+                found_body.add(probe)
+            elif start >= summary_start:
+                if end < body_start - 1:
+                    found_summary.add(probe)
+            elif end < summary_start - 1:
+                found_title.add(probe)
+        groups_title = group_hits_from(phase, found_title)
+        groups_summary = group_hits_from(phase, found_summary)
+        groups_body = group_hits_from(phase, found_body)
+        anchor_hits = len(anchors)
 
     group_hits = {
         group: (groups_title[group] * 4) + (groups_summary[group] * 2) + min(groups_body[group], 6)
@@ -174,12 +247,7 @@ def score_article(
     }
     phase_score = float(sum(group_hits.values()))
 
-    anchor_hits = count_occurrences(
-        " ".join([title_norm, summary_norm, body_norm]),
-        REPUBLIC_ANCHORS,
-    )
-
-    tag_score = sum(1 for slug in tag_slugs if slug in TAG_SLUG_SIGNALS[phase]) * 1.3
+    tag_score = len(TAG_SLUG_SIGNALS[phase].intersection(tag_slugs)) * 1.3
     total_score = phase_score + tag_score + (anchor_hits * 0.8)
 
     return total_score, group_hits, anchor_hits, int(sum(1 for value in group_hits.values() if value > 0))
@@ -229,17 +297,17 @@ def build_rationale(
 
 
 def paragraph_score(phase: str, paragraph: str) -> float:
-    text = normalize(paragraph)
-    group_hits = compute_group_hits(phase, text)
-    anchors = count_occurrences(text, REPUBLIC_ANCHORS)
+    # split_paragraphs already collapsed whitespace, so lowering is all normalize would add.
+    text = paragraph.lower()
+    group_hits, anchors = scan_probes(phase, text)
     return float(sum(group_hits.values()) + (anchors * 1.5))
 
 
 def shorten_quote(paragraph: str, max_chars: int = 520) -> str:
-    clean = re.sub(r"\s+", " ", paragraph).strip()
+    clean = WHITESPACE_RE.sub(" ", paragraph).strip()
     if len(clean) <= max_chars:
         return clean
-    sentences = re.split(r"(?<=[.!?])\s+", clean)
+    sentences = SENTENCE_SPLIT_RE.split(clean)
     selected: list[str] = []
     total = 0
     for sentence in sentences:
@@ -255,8 +323,7 @@ def shorten_quote(paragraph: str, max_chars: int = 520) -> str:
     return clean[:max_chars].rsplit(" ", 1)[0].strip()
 
 
-def choose_quote(phase: str, body_text: str, summary: str, title: str) -> tuple[str, str, float]:
-    paragraphs = split_paragraphs(body_text)
+def choose_quote(phase: str, paragraphs: list[str], summary: str, title: str) -> tuple[str, str, float]:
     if paragraphs:
         ranked = sorted(
             ((paragraph_score(phase, paragraph), paragraph) for paragraph in paragraphs),
@@ -273,6 +340,74 @@ def choose_quote(phase: str, body_text: str, summary: str, title: str) -> tuple[
     return title.strip(), "title", 0.25
 
 
+def build_candidate(
+    item: tuple[str, str, str, int, str, str, str, list[str]],
+    min_score: float,
+    min_anchor_hits: int,
+    min_group_hits: int,
+    allow_non_full_text: bool,
+) -> dict:
+    article_uid, title, published_at, year, body_text, text_state, summary, tag_slugs = item
+    has_full_text = text_state == "full"
+    phase = "before" if year < MILESTONE_YEAR else "after"
+    # Each body is normalized and split once; scoring and quote choice share the results.
+    body_norm = normalize(body_text)
+    # A body with no probe or anchor anywhere cannot yield a scoring paragraph, so skip the per-paragraph pass.
+    paragraphs = split_paragraphs(body_text) if has_any_probe(phase, body_norm) else []
+    summary_norm = normalize(summary)
+
+    score, group_hits, anchor_hits, active_groups = score_article(
+        phase=phase,
+        title_norm=normalize(title),
+        summary_norm=summary_norm,
+        tag_slugs=tag_slugs,
+        body_norm=body_norm,
+    )
+    strongest_group = max(group_hits.items(), key=lambda item: item[1])[0]
+    passes_threshold = (
+        score >= min_score
+        and anchor_hits >= min_anchor_hits
+        and active_groups >= min_group_hits
+    )
+    should_include = passes_threshold and (allow_non_full_text or has_full_text)
+    quote_text, quote_source, quote_confidence = choose_quote(
+        phase=phase,
+        paragraphs=paragraphs,
+        summary=summary,
+        title=title,
+    )
+    connection_text = build_connection_text(phase=phase, strongest_group=strongest_group)
+    rationale = build_rationale(
+        phase=phase,
+        score=score,
+        anchor_hits=anchor_hits,
+        group_hits=group_hits,
+        selected=should_include,
+    )
+    if passes_threshold and not should_include:
+        rationale = (
+            "Excluded from core narrative because strict mode requires full-text evidence. "
+            f"Current text_state={text_state}. {rationale}"
+        )
+    return {
+        "article_uid": article_uid,
+        "published_at": published_at,
+        "phase": phase,
+        "score": score,
+        "strength": strength_label(score),
+        "include": should_include,
+        "passes_threshold": passes_threshold,
+        "text_state": text_state,
+        "connection": connection_text,
+        "rationale": rationale,
+        "quote_text": quote_text,
+        "quote_source": quote_source,
+        "quote_confidence": quote_confidence,
+        "summary_norm": summary_norm,
+        "tag_slugs": tag_slugs,
+    }
+
+
 def ensure_tables(cur: sqlite3.Cursor) -> None:
     cur.executescript(
         """
@@ -315,6 +450,9 @@ def ensure_tables(cur: sqlite3.Cursor) -> None:
         CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_lookup
         ON republic_shift_evidence(article_uid, generated_at DESC, id DESC);
 
+        CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_latest
+        ON republic_shift_evidence(article_uid, id DESC);
+
         CREATE INDEX IF NOT EXISTS idx_republic_shift_evidence_selected
         ON republic_shift_evidence(include_in_story, phase, relevance_score DESC);
         """
@@ -325,8 +463,8 @@ def build_fingerprint(
     article_uid: str,
     phase: str,
     score: float,
-    summary: str,
-    tag_slugs: list[str],
+    summary_norm: str,
+    sorted_tag_slugs: list[str],
     quote: str,
 ) -> str:
     payload = "|".join(
@@ -334,8 +472,8 @@ def build_fingerprint(
             article_uid,
             phase,
             f"{score:.4f}",
-            normalize(summary),
-            ",".join(sorted(tag_slugs)),
+            summary_norm,
+            ",".join(sorted_tag_slugs),
             normalize(quote),
         ]
     )
@@ -393,6 +531,12 @@ def main() -> int:
         action="store_true",
         help="Allow non-full-text records to be selected. Default requires text_state='full'.",
     )
+    parser.add_argument(
+        "--score-processes",
+        type=int,
+        default=0,
+        help="Score articles in this many worker processes (0 scores in the main process).",
+    )
     parser.add_argument(
         "--dry-run",
         action="store_true",
@@ -404,6 +548,17 @@ def main() -> int:
     analysis_conn = sqlite3.connect(Path(args.analysis_db_path))
     master_conn.row_factory = sqlite3.Row
     analysis_conn.row_factory = sqlite3.Row
+    analysis_conn.executescript(
+        """
+        PRAGMA temp_store = MEMORY;
+        PRAGMA cache_size = -65536;
+        PRAGMA mmap_size = 268435456;
+        """
+    )
+    # Journal mode persists in the file, so a dry run leaves it alone.
+    if not args.dry_run:
+        analysis_conn.execute("PRAGMA journal_mode = WAL")
+        analysis_conn.execute("PRAGMA synchronous = NORMAL")
     master_cur = master_conn.cursor()
     analysis_cur = analysis_conn.cursor()
 
@@ -411,25 +566,23 @@ def main() -> int:
 
     tag_rows = analysis_cur.execute(
         """
-        SELECT at.article_uid, t.slug
+        SELECT at.article_uid, GROUP_CONCAT(DISTINCT t.slug) AS slugs
         FROM article_tags at
         JOIN tags t ON t.id = at.tag_id
-        ORDER BY at.article_uid ASC
+        GROUP BY at.article_uid
         """
-    ).fetchall()
-    tag_slugs_by_uid: dict[str, list[str]] = defaultdict(list)
-    for row in tag_rows:
-        uid = str(row["article_uid"])
-        slug = str(row["slug"])
-        if slug not in tag_slugs_by_uid[uid]:
-            tag_slugs_by_uid[uid].append(slug)
+    )
+    # Sorted once here because the fingerprint payload lists slugs in sorted order.
+    tag_slugs_by_uid: dict[str, list[str]] = {
+        str(row["article_uid"]): sorted(row["slugs"].split(",")) for row in tag_rows
+    }
 
     summary_rows = analysis_cur.execute(
         """
         SELECT article_uid, COALESCE(summary, '') AS summary
         FROM article_analysis
         """
-    ).fetchall()
+    )
     summary_by_uid = {str(row["article_uid"]): str(row["summary"] or "") for row in summary_rows}
 
     rows = master_cur.execute(
@@ -448,85 +601,64 @@ def main() -> int:
         WHERE a.status IN ('verified', 'published')
         ORDER BY a.published_at ASC, a.id ASC
         """
-    ).fetchall()
-
-    candidates: list[dict] = []
-    for row in rows:
-        article_uid = str(row["article_uid"])
-        title = str(row["title"] or "")
-        summary = summary_by_uid.get(article_uid, "")
-        body_text = str(row["body_text"] or "")
-        text_state = str(row["text_state"] or "missing")
-        has_full_text = text_state == "full"
-        year = int(row["year"])
-        phase = "before" if year < MILESTONE_YEAR else "after"
-        tag_slugs = tag_slugs_by_uid.get(article_uid, [])
-
-        score, group_hits, anchor_hits, active_groups = score_article(
-            phase=phase,
-            title=title,
-            summary=summary,
-            tag_slugs=tag_slugs,
-            body_text=body_text,
-        )
-        strongest_group = max(group_hits.items(), key=lambda item: item[1])[0]
-        passes_threshold = (
-            score >= float(args.min_score)
-            and anchor_hits >= int(args.min_anchor_hits)
-            and active_groups >= int(args.min_group_hits)
-        )
-        should_include = passes_threshold and (bool(args.allow_non_full_text) or has_full_text)
-        quote_text, quote_source, quote_confidence = choose_quote(
-            phase=phase,
-            body_text=body_text,
-            summary=summary,
-            title=title,
-        )
-        connection_text = build_connection_text(phase=phase, strongest_group=strongest_group)
-        rationale = build_rationale(
-            phase=phase,
-            score=score,
-            anchor_hits=anchor_hits,
-            group_hits=group_hits,
-            selected=should_include,
-        )
-        if passes_threshold and not should_include:
-            rationale = (
-                "Excluded from core narrative because strict mode requires full-text evidence. "
-                f"Current text_state={text_state}. {rationale}"
-            )
-        candidates.append(
-            {
-                "article_uid": article_uid,
-                "published_at": str(row["published_at"]),
-                "phase": phase,
-                "score": score,
-                "strength": strength_label(score),
-                "include": should_include,
-                "passes_threshold": passes_threshold,
-                "text_state": text_state,
-                "connection": connection_text,
-                "rationale": rationale,
-                "quote_text": quote_text,
-                "quote_source": quote_source,
-                "quote_confidence": quote_confidence,
-                "summary": summary,
-                "tag_slugs": tag_slugs,
-            }
+    )
+
+    # Rows stream from the cursor so raw bodies are dropped once each candidate is built.
+    items = (
+        (
+            str(row["article_uid"]),
+            str(row["title"] or ""),
+            str(row["published_at"]),
+            int(row["year"]),
+            str(row["body_text"] or ""),
+            str(row["text_state"] or "missing"),
+            summary_by_uid.get(str(row["article_uid"]), ""),
+            tag_slugs_by_uid.get(str(row["article_uid"]), []),
         )
+        for row in rows
+    )
+    score = partial(
+        build_candidate,
+        min_score=float(args.min_score),
+        min_anchor_hits=int(args.min_anchor_hits),
+        min_group_hits=int(args.min_group_hits),
+        allow_non_full_text=bool(args.allow_non_full_text),
+    )
+
+    # Scoring is pure CPU work per article, so it can be spread over a process pool.
+    score_processes = max(0, int(args.score_processes))
+    score_context = ProcessPoolExecutor(max_workers=score_processes) if score_processes else nullcontext()
+    with score_context as score_pool:
+        if score_pool is None:
+            candidates = list(map(score, items))
+        else:
+            candidates = list(score_pool.map(score, items, chunksize=SCORE_CHUNK_SIZE))
 
     selected_ids_by_phase: dict[str, set[str]] = {"before": set(), "after": set()}
     for phase in ("before", "after"):
         phase_candidates = [row for row in candidates if row["phase"] == phase and row["include"]]
         phase_candidates.sort(key=lambda row: (-row["score"], row["published_at"]))
         for row in phase_candidates[: int(args.max_per_phase)]:
-            selected_ids_by_phase[phase].add(str(row["article_uid"]))
+            selected_ids_by_phase[phase].add(row["article_uid"])
+
+    existing_fingerprints = {
+        (str(row["article_uid"]), str(row["input_fingerprint"]))
+        for row in analysis_cur.execute(
+            """
+            SELECT article_uid, input_fingerprint
+            FROM republic_shift_evidence
+            WHERE version = ?
+            """,
+            (args.version,),
+        )
+    }
 
     run_uid = f"repcrit-{datetime.now(UTC).strftime('%Y%m%dT%H%M%SZ')}-{uuid.uuid4().hex[:8]}"
-    inserted = 0
+    insert_rows: list[tuple] = []
     skipped = 0
 
     if not args.dry_run:
+        analysis_cur.execute("BEGIN")
         analysis_cur.execute(
             """
             INSERT INTO republic_shift_evidence_runs (
@@ -551,8 +683,8 @@ def main() -> int:
         )
 
     for row in candidates:
-        phase = str(row["phase"])
-        article_uid = str(row["article_uid"])
+        phase = row["phase"]
+        article_uid = row["article_uid"]
         include_in_story = 1 if article_uid in selected_ids_by_phase[phase] else 0
         rationale = row["rationale"]
         if include_in_story == 0 and row["include"]:
@@ -563,32 +695,41 @@ def main() -> int:
         fingerprint = build_fingerprint(
             article_uid=article_uid,
             phase=phase,
-            score=float(row["score"]),
-            summary=str(row["summary"]),
-            tag_slugs=list(row["tag_slugs"]),
-            quote=str(row["quote_text"]),
+            score=row["score"],
+            summary_norm=row["summary_norm"],
+            sorted_tag_slugs=row["tag_slugs"],
+            quote=row["quote_text"],
         )
 
-        exists = analysis_cur.execute(
-            """
-            SELECT 1
-            FROM republic_shift_evidence
-            WHERE article_uid = ?
-              AND version = ?
-              AND input_fingerprint = ?
-            LIMIT 1
-            """,
-            (article_uid, args.version, fingerprint),
-        ).fetchone()
-        if exists:
+        if (article_uid, fingerprint) in existing_fingerprints:
             skipped += 1
             continue
 
-        inserted += 1
-        if args.dry_run:
-            continue
+        insert_rows.append(
+            (
+                article_uid,
+                phase,
+                include_in_story,
+                row["score"],
+                row["strength"],
+                row["connection"],
+                rationale,
+                row["quote_text"],
+                row["quote_source"],
+                row["quote_confidence"],
+                args.method,
+                args.version,
+                fingerprint,
+                run_uid,
+            )
+        )
 
-        analysis_cur.execute(
+    inserted = len(insert_rows)
+    selected_before = len(selected_ids_by_phase["before"])
+    selected_after = len(selected_ids_by_phase["after"])
+
+    if not args.dry_run:
+        analysis_cur.executemany(
             """
             INSERT INTO republic_shift_evidence (
                 article_uid,
@@ -608,28 +749,8 @@ def main() -> int:
             )
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """,
-            (
-                article_uid,
-                phase,
-                include_in_story,
-                float(row["score"]),
-                str(row["strength"]),
-                str(row["connection"]),
-                rationale,
-                str(row["quote_text"]),
-                str(row["quote_source"]),
-                float(row["quote_confidence"]),
-                args.method,
-                args.version,
-                fingerprint,
-                run_uid,
-            ),
+            insert_rows,
         )
-
-    selected_before = len(selected_ids_by_phase["before"])
-    selected_after = len(selected_ids_by_phase["after"])
-
-    if not args.dry_run:
         analysis_cur.execute(
             """
             UPDATE republic_shift_evidence_runs
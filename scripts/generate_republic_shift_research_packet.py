@@ -4,16 +4,29 @@
 from __future__ import annotations
 
 import argparse
+import codecs
 import json
 import re
 import sqlite3
-from collections import defaultdict
+from collections.abc import Iterable
+from dataclasses import dataclass, fields
 from datetime import UTC, datetime
+from itertools import islice
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 DEFAULT_METHOD = "republic_research_packet"
 DEFAULT_VERSION = "republic_research_v1"
 
+WHITESPACE_RE = re.compile(r"\s+")
+LEAD_GROUP_RE = re.compile(r"lead_group=([a-z_]+)")
+# orjson prints tiny/huge floats as 1e-5 / 1e16; json (repr) prints 1e-05 / 1e+16.
+ORJSON_EXPONENT_RE = re.compile(rb"e-?\d+,?\n")
+
 LEAD_GROUPS = {
     "institutional_grammar",
     "decay_diagnostics",
@@ -24,8 +37,8 @@ LEAD_GROUPS = {
     "cross_currents",
 }
 
-TAG_SIGNALS: dict[str, set[str]] = {
-    "before": {
+TAG_SIGNALS: dict[str, frozenset[str]] = {
+    "before": frozenset({
         "democracy",
         "law-and-justice",
         "public-institutions",
@@ -33,8 +46,8 @@ TAG_SIGNALS: dict[str, set[str]] = {
         "nationalism",
         "secularism",
         "education-policy",
-    },
-    "after": {
+    }),
+    "after": frozenset({
         "democracy",
         "pluralism",
         "ethics",
@@ -42,7 +55,7 @@ TAG_SIGNALS: dict[str, set[str]] = {
         "ecology",
         "technology-and-society",
         "public-sphere",
-    },
+    }),
 }
 
 ARGUMENT_TEXT: dict[str, str] = {
@@ -63,61 +76,128 @@ ARGUMENT_TEXT: dict[str, str] = {
 }
 
 
+@dataclass(slots=True)
+class Candidate:
+    article_uid: str
+    phase: str
+    published_date: str
+    publication: str
+    title: str
+    url: str
+    summary_snippet: str
+    signal_tags: list[str]
+    signal_count: int
+    relevance_score: float
+    strength_label: str
+    lead_group: str
+    argument_text: str
+    connection_text: str
+    quote_text: str
+    quote_source: str
+    quote_confidence: float
+    candidate_include: bool
+    rationale: str
+    include_in_story: bool
+    selection_reason: str
+    fingerprint: str
+    text_state: str
+    evidence_method: str
+    evidence_version: str
+    evidence_run_uid: str
+    evidence_generated_at: str
+
+
+def candidate_fields(value: object) -> dict:
+    # Shallow field dict in declaration order, matching how orjson serializes dataclasses.
+    if isinstance(value, Candidate):
+        return {field.name: getattr(value, field.name) for field in fields(value)}
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def escape_json_ascii(error: UnicodeEncodeError) -> tuple[str, int]:
+    escaped = []
+    for char in error.object[error.start:error.end]:
+        code = ord(char)
+        if code > 0xFFFF:
+            code -= 0x10000
+            escaped.append(f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}")
+        else:
+            escaped.append(f"\\u{code:04x}")
+    return "".join(escaped), error.end
+
+
+codecs.register_error("json_ascii", escape_json_ascii)
+
+
+def encode_json(value: dict) -> bytes:
+    if orjson is not None:
+        try:
+            encoded = orjson.dumps(value, option=orjson.OPT_INDENT_2)
+        except orjson.JSONEncodeError:
+            encoded = None
+        # Relevance scores are plain decimals; anything orjson would print as 0.0000x or in exponent form goes to json.
+        if encoded is not None and b".0000" not in encoded and ORJSON_EXPONENT_RE.search(encoded) is None:
+            # Quotes carry curly quotes and dashes; escape them here so the packet keeps ensure_ascii=True output.
+            return encoded.decode("utf-8").encode("ascii", "json_ascii").replace(b"\x7f", b"\\u007f")
+    return json.dumps(value, ensure_ascii=True, indent=2, default=candidate_fields).encode("ascii")
+
+
 def normalize(text: str | None) -> str:
-    return re.sub(r"\s+", " ", text or "").strip().lower()
+    return WHITESPACE_RE.sub(" ", text or "").strip().lower()
 
 
 def summarize_text(text: str | None, max_chars: int = 280) -> str:
-    clean = re.sub(r"\s+", " ", text or "").strip()
+    clean = WHITESPACE_RE.sub(" ", text or "").strip()
     if len(clean) <= max_chars:
         return clean
     return clean[: max_chars - 1].rstrip() + "..."
 
 
 def parse_lead_group(rationale: str) -> str:
-    match = re.search(r"lead_group=([a-z_]+)", rationale or "")
+    if not rationale:
+        return "cross_currents"
+    match = LEAD_GROUP_RE.search(rationale)
     lead_group = (match.group(1) if match else "").strip()
     if lead_group in LEAD_GROUPS:
         return lead_group
     return "cross_currents"
 
 
-def classify_unselected_reason(row: dict, full_text_only: bool) -> str:
-    if row["candidate_include"] and full_text_only and row["text_state"] != "full":
+def classify_unselected_reason(row: Candidate, full_text_only: bool) -> str:
+    if row.candidate_include and full_text_only and row.text_state != "full":
         return "blocked_non_full_text"
-    if row["candidate_include"]:
-        if "per-phase cap" in str(row["rationale"]).lower():
+    if row.candidate_include:
+        if "per-phase cap" in row.rationale.lower():
             return "below_phase_cap"
         return "below_cutoff"
     return "below_cutoff"
 
 
 def collect_data(
-    master_conn: sqlite3.Connection, analysis_conn: sqlite3.Connection
-) -> tuple[list[sqlite3.Row], dict[str, str], dict[str, list[str]], sqlite3.Row | None]:
+    analysis_conn: sqlite3.Connection,
+) -> tuple[sqlite3.Cursor, dict[str, str], dict[str, list[str]], sqlite3.Row | None]:
     summary_rows = analysis_conn.execute(
         """
         SELECT article_uid, COALESCE(summary, '') AS summary
         FROM article_analysis
         """
-    ).fetchall()
+    )
     summary_by_uid = {str(row["article_uid"]): str(row["summary"] or "") for row in summary_rows}
 
     tag_rows = analysis_conn.execute(
         """
-        SELECT at.article_uid, t.slug
+        SELECT at.article_uid, GROUP_CONCAT(DISTINCT t.slug) AS slugs
         FROM article_tags at
         JOIN tags t ON t.id = at.tag_id
-        ORDER BY at.article_uid ASC, t.slug ASC
+        GROUP BY at.article_uid
         """
-    ).fetchall()
-    tags_by_uid: dict[str, list[str]] = defaultdict(list)
-    for row in tag_rows:
-        uid = str(row["article_uid"])
-        slug = str(row["slug"])
-        if slug not in tags_by_uid[uid]:
-            tags_by_uid[uid].append(slug)
+    )
+    # GROUP_CONCAT order is unspecified; signal tags are listed in slug order.
+    tags_by_uid: dict[str, list[str]] = {
+        str(row["article_uid"]): sorted(row["slugs"].split(",")) for row in tag_rows
+    }
 
+    # Latest evidence per article, joined to its master article and ranked the way the packet lists it.
     evidence_rows = analysis_conn.execute(
         """
         SELECT
@@ -135,7 +215,12 @@ def collect_data(
             e.version,
             e.input_fingerprint,
             e.run_uid,
-            e.generated_at
+            e.generated_at,
+            a.title,
+            a.canonical_url AS url,
+            a.published_at,
+            p.name AS publication,
+            COALESCE(tx.text_state, 'missing') AS text_state
         FROM republic_shift_evidence e
         JOIN (
             SELECT article_uid, MAX(id) AS max_id
@@ -143,9 +228,22 @@ def collect_data(
             GROUP BY article_uid
         ) latest
           ON latest.max_id = e.id
-        ORDER BY e.relevance_score DESC, e.article_uid ASC
+        JOIN master.articles a
+          ON a.article_uid = e.article_uid
+        JOIN master.publications p
+          ON p.id = a.publication_id
+        LEFT JOIN master.article_texts tx
+          ON tx.article_uid = a.article_uid
+         AND tx.is_primary = 1
+        WHERE a.status IN ('verified', 'published')
+        ORDER BY
+            e.phase ASC,
+            e.relevance_score DESC,
+            SUBSTR(a.published_at, 1, 10) ASC,
+            a.title ASC,
+            e.article_uid ASC
         """
-    ).fetchall()
+    )
 
     latest_run = analysis_conn.execute(
         """
@@ -170,156 +268,115 @@ def collect_data(
 
 
 def build_candidates(
-    evidence_rows: list[sqlite3.Row],
+    evidence_rows: Iterable[sqlite3.Row],
     summary_by_uid: dict[str, str],
     tags_by_uid: dict[str, list[str]],
-    master_conn: sqlite3.Connection,
-) -> list[dict]:
-    article_rows = master_conn.execute(
-        """
-        SELECT
-            a.article_uid,
-            a.title,
-            a.canonical_url AS url,
-            a.published_at,
-            p.name AS publication,
-            COALESCE(tx.text_state, 'missing') AS text_state
-        FROM articles a
-        JOIN publications p
-          ON p.id = a.publication_id
-        LEFT JOIN article_texts tx
-          ON tx.article_uid = a.article_uid
-         AND tx.is_primary = 1
-        WHERE a.status IN ('verified', 'published')
-        """
-    ).fetchall()
-    article_by_uid = {str(row["article_uid"]): row for row in article_rows}
-
-    candidates: list[dict] = []
+) -> list[Candidate]:
+    candidates: list[Candidate] = []
     for row in evidence_rows:
         uid = str(row["article_uid"])
-        article = article_by_uid.get(uid)
-        if article is None:
-            continue
-
         phase = str(row["phase"])
-        tag_slugs = tags_by_uid.get(uid, [])
+        signals = TAG_SIGNALS[phase]
+        signal_tags = [slug for slug in tags_by_uid.get(uid, []) if slug in signals]
         lead_group = parse_lead_group(str(row["rationale"] or ""))
         connection = str(row["connection_text"] or "").strip()
         argument_text = ARGUMENT_TEXT.get(lead_group, ARGUMENT_TEXT["cross_currents"])
         summary = summarize_text(summary_by_uid.get(uid, ""), max_chars=300)
 
         candidates.append(
-            {
-                "article_uid": uid,
-                "phase": phase,
-                "published_date": str(article["published_at"] or "")[:10],
-                "publication": str(article["publication"] or ""),
-                "title": str(article["title"] or ""),
-                "url": str(article["url"] or ""),
-                "summary_snippet": summary,
-                "signal_tags": [slug for slug in tag_slugs if slug in TAG_SIGNALS[phase]],
-                "signal_count": sum(1 for slug in tag_slugs if slug in TAG_SIGNALS[phase]),
-                "relevance_score": float(row["relevance_score"]),
-                "strength_label": str(row["strength_label"]),
-                "lead_group": lead_group,
-                "argument_text": argument_text,
-                "connection_text": connection,
-                "quote_text": str(row["quote_text"] or "").strip(),
-                "quote_source": str(row["quote_source"]),
-                "quote_confidence": float(row["quote_confidence"]),
-                "candidate_include": bool(row["include_in_story"]),
-                "rationale": str(row["rationale"] or ""),
-                "include_in_story": False,
-                "selection_reason": "",
-                "fingerprint": str(row["input_fingerprint"] or ""),
-                "text_state": str(article["text_state"] or "missing"),
-                "evidence_method": str(row["method"]),
-                "evidence_version": str(row["version"]),
-                "evidence_run_uid": str(row["run_uid"]),
-                "evidence_generated_at": str(row["generated_at"]),
-            }
+            Candidate(
+                article_uid=uid,
+                phase=phase,
+                published_date=str(row["published_at"] or "")[:10],
+                publication=str(row["publication"] or ""),
+                title=str(row["title"] or ""),
+                url=str(row["url"] or ""),
+                summary_snippet=summary,
+                signal_tags=signal_tags,
+                signal_count=len(signal_tags),
+                relevance_score=float(row["relevance_score"]),
+                strength_label=str(row["strength_label"]),
+                lead_group=lead_group,
+                argument_text=argument_text,
+                connection_text=connection,
+                quote_text=str(row["quote_text"] or "").strip(),
+                quote_source=str(row["quote_source"]),
+                quote_confidence=float(row["quote_confidence"]),
+                candidate_include=bool(row["include_in_story"]),
+                rationale=str(row["rationale"] or ""),
+                include_in_story=False,
+                selection_reason="",
+                fingerprint=str(row["input_fingerprint"] or ""),
+                text_state=str(row["text_state"] or "missing"),
+                evidence_method=str(row["method"]),
+                evidence_version=str(row["version"]),
+                evidence_run_uid=str(row["run_uid"]),
+                evidence_generated_at=str(row["generated_at"]),
+            )
         )
 
-    candidates.sort(
-        key=lambda item: (item["phase"], -float(item["relevance_score"]), item["published_date"], item["title"])
-    )
     return candidates
 
 
 def select_records(
-    candidates: list[dict],
+    candidates: list[Candidate],
     max_per_phase: int,
     full_text_only: bool,
     backfill_to_cap: bool,
-) -> tuple[list[dict], dict[str, int], dict[str, int]]:
+) -> tuple[list[Candidate], dict[str, int], dict[str, int]]:
     phase_totals = {"before": 0, "after": 0}
     phase_full_text_totals = {"before": 0, "after": 0}
+    phase_rows: dict[str, list[Candidate]] = {"before": [], "after": []}
     for row in candidates:
-        phase = row["phase"]
+        phase = row.phase
+        phase_rows[phase].append(row)
         phase_totals[phase] += 1
-        if row["text_state"] == "full":
+        if row.text_state == "full":
             phase_full_text_totals[phase] += 1
 
+    # Candidates arrive ranked by (phase, -relevance_score, published_date, title), so the top picks
+    # are simply the first qualifying rows of each phase.
     selected_uids: dict[str, set[str]] = {"before": set(), "after": set()}
-    for phase in ("before", "after"):
-        phase_rows = [row for row in candidates if row["phase"] == phase]
-        eligible = [
-            row
-            for row in phase_rows
-            if (not full_text_only or row["text_state"] == "full") and bool(row["candidate_include"])
-        ]
-        eligible.sort(
-            key=lambda item: (-float(item["relevance_score"]), item["published_date"], item["title"])
-        )
-        picks = eligible[:max_per_phase]
+    for phase, rows in phase_rows.items():
+        usable = [row for row in rows if not full_text_only or row.text_state == "full"]
+        picks = list(islice((row for row in usable if row.candidate_include), max_per_phase))
 
         if backfill_to_cap and len(picks) < max_per_phase:
-            picked_uids = {str(item["article_uid"]) for item in picks}
-            fallback_pool = [
-                row
-                for row in phase_rows
-                if (not full_text_only or row["text_state"] == "full")
-                and str(row["article_uid"]) not in picked_uids
-            ]
-            fallback_pool.sort(
-                key=lambda item: (-float(item["relevance_score"]), item["published_date"], item["title"])
-            )
-            for row in fallback_pool:
+            picked_uids = {item.article_uid for item in picks}
+            for row in usable:
+                if row.article_uid in picked_uids:
+                    continue
                 picks.append(row)
-                picked_uids.add(str(row["article_uid"]))
+                picked_uids.add(row.article_uid)
                 if len(picks) >= max_per_phase:
                     break
 
-        selected_uids[phase] = {str(item["article_uid"]) for item in picks}
+        selected_uids[phase] = {item.article_uid for item in picks}
 
-    selected_records: list[dict] = []
+    selected_records: list[Candidate] = []
     for row in candidates:
-        phase = row["phase"]
-        uid = str(row["article_uid"])
-        row["include_in_story"] = uid in selected_uids[phase]
-        if row["include_in_story"]:
-            if bool(row["candidate_include"]):
-                row["selection_reason"] = "passed_threshold"
+        phase = row.phase
+        uid = row.article_uid
+        row.include_in_story = uid in selected_uids[phase]
+        if row.include_in_story:
+            if row.candidate_include:
+                row.selection_reason = "passed_threshold"
             else:
-                row["selection_reason"] = "backfill_to_phase_cap"
+                row.selection_reason = "backfill_to_phase_cap"
             selected_records.append(row)
         else:
-            row["selection_reason"] = classify_unselected_reason(row, full_text_only)
-            if row["selection_reason"] == "blocked_non_full_text":
-                row["rationale"] = (
+            row.selection_reason = classify_unselected_reason(row, full_text_only)
+            if row.selection_reason == "blocked_non_full_text":
+                row.rationale = (
                     "Not selected for packet because strict mode requires full-text evidence. "
-                    + str(row["rationale"])
+                    + row.rationale
                 ).strip()
 
-    selected_records.sort(
-        key=lambda item: (item["phase"], -float(item["relevance_score"]), item["published_date"], item["title"])
-    )
     return selected_records, phase_totals, phase_full_text_totals
 
 
 def build_markdown(
-    selected: list[dict],
+    selected: list[Candidate],
     generated_at: str,
     method: str,
     version: str,
@@ -330,8 +387,8 @@ def build_markdown(
     phase_full_text_totals: dict[str, int],
     top_n: int = 6,
 ) -> str:
-    selected_before = [row for row in selected if row["phase"] == "before"]
-    selected_after = [row for row in selected if row["phase"] == "after"]
+    selected_before = [row for row in selected if row.phase == "before"]
+    selected_after = [row for row in selected if row.phase == "after"]
 
     lines: list[str] = []
     lines.append("# Republic Shift Research Brief")
@@ -362,19 +419,19 @@ def build_markdown(
     lines.append("")
     for index, row in enumerate(selected_before[:top_n], start=1):
         lines.append(
-            f"{index}. {row['published_date']} | {row['title']} ({row['publication']}) | score {row['relevance_score']:.2f}"
+            f"{index}. {row.published_date} | {row.title} ({row.publication}) | score {row.relevance_score:.2f}"
         )
-        lines.append(f"Summary: {row['summary_snippet']}")
-        lines.append(f"Takeaway: {row['argument_text']} {row['connection_text']}".strip())
+        lines.append(f"Summary: {row.summary_snippet}")
+        lines.append(f"Takeaway: {row.argument_text} {row.connection_text}".strip())
         lines.append("")
     lines.append("## Phase 2 Evidence (After)")
     lines.append("")
     for index, row in enumerate(selected_after[:top_n], start=1):
         lines.append(
-            f"{index}. {row['published_date']} | {row['title']} ({row['publication']}) | score {row['relevance_score']:.2f}"
+            f"{index}. {row.published_date} | {row.title} ({row.publication}) | score {row.relevance_score:.2f}"
         )
-        lines.append(f"Summary: {row['summary_snippet']}")
-        lines.append(f"Takeaway: {row['argument_text']} {row['connection_text']}".strip())
+        lines.append(f"Summary: {row.summary_snippet}")
+        lines.append(f"Takeaway: {row.argument_text} {row.connection_text}".strip())
         lines.append("")
     lines.append("## Notes")
     lines.append("")
@@ -425,16 +482,27 @@ def main() -> int:
     full_text_only = not bool(args.allow_non_full_text)
     backfill_to_cap = not bool(args.no_backfill)
 
-    master_conn = sqlite3.connect(Path(args.master_db_path))
-    analysis_conn = sqlite3.connect(Path(args.analysis_db_path))
-    master_conn.row_factory = sqlite3.Row
+    # Both are opened read-only; the packet only reads, so journal-mode changes are left to the writers.
+    analysis_conn = sqlite3.connect(f"{Path(args.analysis_db_path).resolve().as_uri()}?mode=ro", uri=True)
     analysis_conn.row_factory = sqlite3.Row
+    master_uri = f"{Path(args.master_db_path).resolve().as_uri()}?mode=ro"
+    analysis_conn.execute("ATTACH DATABASE ? AS master", (master_uri,))
+    analysis_conn.executescript(
+        """
+        PRAGMA query_only = 1;
+        PRAGMA temp_store = MEMORY;
+        PRAGMA main.cache_size = -65536;
+        PRAGMA master.cache_size = -65536;
+        PRAGMA main.mmap_size = 268435456;
+        PRAGMA master.mmap_size = 268435456;
+        """
+    )
 
-    evidence_rows, summary_by_uid, tags_by_uid, latest_run = collect_data(master_conn, analysis_conn)
-    if not evidence_rows:
+    # Evidence rows stream from the cursor straight into Candidate dataclasses.
+    evidence_rows, summary_by_uid, tags_by_uid, latest_run = collect_data(analysis_conn)
+    candidates = build_candidates(evidence_rows, summary_by_uid, tags_by_uid)
+    if not candidates:
         raise SystemExit("No republic_shift_evidence rows found. Run generate_republic_critical_evidence.py first.")
-
-    candidates = build_candidates(evidence_rows, summary_by_uid, tags_by_uid, master_conn)
     selected, phase_totals, phase_full_text_totals = select_records(
         candidates=candidates,
         max_per_phase=int(args.max_per_phase),
@@ -457,8 +525,8 @@ def main() -> int:
         "phase_totals": phase_totals,
         "phase_full_text_totals": phase_full_text_totals,
         "selected_counts": {
-            "before": sum(1 for row in selected if row["phase"] == "before"),
-            "after": sum(1 for row in selected if row["phase"] == "after"),
+            "before": sum(1 for row in selected if row.phase == "before"),
+            "after": sum(1 for row in selected if row.phase == "after"),
         },
         "source_run": dict(latest_run) if latest_run is not None else None,
         "selected_records": selected,
@@ -469,7 +537,7 @@ def main() -> int:
     output_md_path = Path(args.output_md)
     output_json_path.parent.mkdir(parents=True, exist_ok=True)
     output_md_path.parent.mkdir(parents=True, exist_ok=True)
-    output_json_path.write_text(json.dumps(payload, ensure_ascii=True, indent=2) + "\n", encoding="utf-8")
+    output_json_path.write_bytes(encode_json(payload) + b"\n")
 
     brief = build_markdown(
         selected=selected,
@@ -490,7 +558,6 @@ def main() -> int:
     print(f"Output JSON: {output_json_path}")
     print(f"Output MD: {output_md_path}")
 
-    master_conn.close()
     analysis_conn.close()
     return 0
 
@@ -72,6 +72,9 @@ def ensure_annotation_tables(cur: sqlite3.Cursor) -> None:
         CREATE INDEX IF NOT EXISTS idx_shift_annotations_lookup
         ON shift_annotations(article_uid, shift_id, generated_at DESC, id DESC);
 
+        CREATE INDEX IF NOT EXISTS idx_shift_annotations_latest
+        ON shift_annotations(article_uid, shift_id, id DESC);
+
         CREATE INDEX IF NOT EXISTS idx_shift_annotations_run_uid
         ON shift_annotations(run_uid);
         """